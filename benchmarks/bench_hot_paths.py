@@ -0,0 +1,178 @@
+"""
+Benchmarks for the per-call overhead of the SDK hot paths.
+
+Network calls go to an in-process stub server, so the numbers reflect
+the SDK (templating, serialization, connection handling) rather than the
+remote APIs. Save results to compare across versions:
+
+    python benchmarks/bench_hot_paths.py --output baseline.json
+    python benchmarks/bench_hot_paths.py --compare baseline.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from stub_server import StubServer  # noqa: E402
+from virtuals_sdk import sdk  # noqa: E402
+from virtuals_sdk.game import Agent  # noqa: E402
+from virtuals_sdk.functions.telegram import TelegramClient  # noqa: E402
+from virtuals_sdk.functions.discord import DiscordClient  # noqa: E402
+from virtuals_sdk.ratelimit import RateLimiter  # noqa: E402
+from virtuals_sdk.transport import HTTPTransport  # noqa: E402
+
+
+def measure(fn: Callable[[], object], number: int, repeat: int) -> Dict[str, float]:
+    """Run `fn` `number` times per round and report the per-call time of each round"""
+    fn()  # warm up caches and connections
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    return {
+        "median_us": statistics.median(rounds) * 1e6,
+        "min_us": min(rounds) * 1e6,
+        "ops_per_sec": 1 / statistics.median(rounds),
+    }
+
+
+def build_agent(api_key: str, transport: HTTPTransport) -> Agent:
+    agent = Agent(
+        api_key=api_key,
+        goal="Help users and provide valuable interactions",
+        description="A helpful assistant that engages with users " * 20,
+        world_info="A digital environment where the agent helps users " * 50,
+        transport=transport
+    )
+    agent.use_default_twitter_functions(["wait", "reply_tweet"])
+    tg_client = TelegramClient("benchmark-token", transport=transport, rate_limiter=RateLimiter())
+    dc_client = DiscordClient("benchmark-token", transport=transport, rate_limiter=RateLimiter())
+    for client in (tg_client, dc_client):
+        for fn_name in client.available_functions:
+            agent.add_custom_function(client.get_function(fn_name))
+    return agent
+
+
+def run(number: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+
+    with StubServer() as server, HTTPTransport(pool_maxsize=16) as transport, \
+            contextlib.redirect_stdout(io.StringIO()), tempfile.TemporaryDirectory() as tmp:
+        sdk.GameSDK.api_url = server.url + "/api"
+        sdk.AsyncGameSDK.api_url = server.url + "/api"
+        TelegramClient.create_api_url = lambda self, endpoint: f"{server.url}/bot{self.bot_token}/{endpoint}"
+
+        agent = build_agent("benchmark-key", transport)
+        tg_client = TelegramClient("benchmark-token", transport=transport, rate_limiter=RateLimiter())
+        send_media = tg_client.get_function("send_media")
+        send_message = tg_client.get_function("send_message")
+        media_args = {"chat_id": "123", "media_type": "photo", "media": "https://example.com/a.png", "caption": "hello"}
+        response = {"response": {"result": {"message_id": 42}}, **media_args}
+
+        results["function.prepare_request"] = measure(lambda: send_media._prepare_request(media_args), number * 10, repeat)
+        results["function.render_feedback"] = measure(lambda: send_media._success_template.render(response), number * 10, repeat)
+        results["function.toJson"] = measure(lambda: [fn.toJson() for fn in agent.custom_functions], number, repeat)
+
+        def rebuild_config():
+            agent._invalidate_config()
+            return agent._config()
+
+        results["agent.config_rebuild"] = measure(rebuild_config, number, repeat)
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            results["agent.export"] = measure(agent.export, number, repeat)
+        finally:
+            os.chdir(cwd)
+
+        results["game_sdk.react"] = measure(
+            lambda: agent.react("bench-session", "telegram", event="hello", task="reply"), number, repeat)
+        results["function.call"] = measure(lambda: send_message("123", "hello"), number, repeat)
+
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            pass
+        else:
+            concurrency = 50
+
+            async def react_batch():
+                await asyncio.gather(*[
+                    agent.areact(f"session-{i}", "telegram", event="hello") for i in range(concurrency)
+                ])
+
+            async def close():
+                await agent.async_game_sdk.aclose()
+
+            loop = asyncio.new_event_loop()
+            try:
+                batch = measure(lambda: loop.run_until_complete(react_batch()), max(1, number // 10), repeat)
+                results["async_game_sdk.react_x50"] = batch
+                loop.run_until_complete(close())
+            finally:
+                loop.close()
+
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], max_regression: float) -> List[str]:
+    """Print a comparison table and return the benchmarks that regressed"""
+    regressions = []
+    print(f"\n{'benchmark':32} {'baseline us':>12} {'current us':>12} {'ratio':>7}")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:32} {'-':>12} {current['median_us']:12.1f} {'new':>7}")
+            continue
+        ratio = current["median_us"] / before["median_us"]
+        flag = "  <-- regression" if ratio > max_regression else ""
+        print(f"{name:32} {before['median_us']:12.1f} {current['median_us']:12.1f} {ratio:7.2f}{flag}")
+        if ratio > max_regression:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200, help="calls per round")
+    parser.add_argument("--repeat", type=int, default=5, help="rounds per benchmark")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    parser.add_argument("--max-regression", type=float, default=1.25,
+                        help="fail when a benchmark is this many times slower than the baseline")
+    args = parser.parse_args()
+
+    results = run(args.number, args.repeat)
+
+    print(f"{'benchmark':32} {'median us':>12} {'min us':>12} {'ops/s':>12}")
+    for name, result in results.items():
+        print(f"{name:32} {result['median_us']:12.1f} {result['min_us']:12.1f} {result['ops_per_sec']:12.0f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": platform.python_version(), "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+In-process stand-in for the GAME API and the Telegram/Discord APIs, used
+by the benchmarks so they measure SDK overhead rather than the network.
+"""
+import gzip
+import json
+import threading
+import zlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        wire_size = len(body)
+        encoding = self.headers.get("Content-Encoding")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+        self.server.record(len(body), wire_size)
+        return body
+
+    def _send(self, status: int, data: dict):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path.endswith("/functions"):
+            self._send(200, {"data": [{"fn_name": "wait", "fn_description": "Wait"},
+                                      {"fn_name": "reply_tweet", "fn_description": "Reply to a tweet"}]})
+        else:
+            self._send(200, {"ok": True, "result": []})
+
+    def do_POST(self):
+        body = self._read_body()
+        if self.path.startswith("/api/"):
+            json.loads(body)
+            self._send(200, {"data": {"action": "wait", "args": {}}})
+        else:
+            self._send(200, {"ok": True, "result": {"message_id": 1}})
+
+    do_PUT = do_POST
+    do_DELETE = do_POST
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Example:
+        with StubServer() as server:
+            GameSDK.api_url = server.url + "/api"
+    """
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), StubHandler)
+        self.url = f"http://{host}:{self.server_address[1]}"
+        self.requests = 0
+        self.received_bytes = 0
+        # request body bytes as sent, before decompression
+        self.wire_bytes = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def record(self, size: int, wire_size: int):
+        with self._lock:
+            self.requests += 1
+            self.received_bytes += size
+            self.wire_bytes += wire_size
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
@@ -1,8 +1,12 @@
 import os
 import time
-from typing import Optional, Dict, Any
-import json
+import asyncio
+import functools
+from typing import Optional, Dict, Any, Iterable
 from virtuals_sdk.game import Agent
+from virtuals_sdk.scheduler import SessionScheduler, ScheduledSession
+from virtuals_sdk.sharding import ShardedScheduler
+from virtuals_sdk.state import StateStore, open_state_store
 
 class AgentRunner:
     def __init__(
@@ -13,31 +17,39 @@ class AgentRunner:
         world_info: str,
         platform: str = "telegram",
         session_id: Optional[str] = None,
-        state_file: str = "agent_state.json"
+        state_file: str = "agent_state.json",
+        state_store: Optional[StateStore] = None
     ):
-        self.agent = Agent(
+        # kept to build the same agent in worker processes, see run_sharded
+        self.agent_config = dict(
             api_key=api_key,
             goal=goal,
             description=description,
             world_info=world_info
         )
+        self.agent = Agent(**self.agent_config)
         self.platform = platform
         self.session_id = session_id or f"session-{int(time.time())}"
         self.state_file = state_file
+        # journal next to `state_file`, or SQLite for a .db/.sqlite file
+        self.state_store = state_store or open_state_store(state_file)
         self.state: Dict[str, Any] = self.load_state()
 
-    def load_state(self) -> Dict[str, Any]:
-        """Load agent state from file if exists"""
-        try:
-            with open(self.state_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
+    def __getstate__(self) -> Dict[str, Any]:
+        # copies for worker processes (see run_sharded) build their own agent
+        # and must not share the state store, which only this process writes
+        state = dict(self.__dict__)
+        state["agent"] = None
+        state["state_store"] = None
+        return state
+
+    def load_state(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Load a session's state (this runner's session by default)"""
+        return self.state_store.get(session_id or self.session_id)
 
-    def save_state(self):
-        """Save current agent state to file"""
-        with open(self.state_file, 'w') as f:
-            json.dump(self.state, f)
+    def save_state(self, changes: Optional[Dict[str, Any]] = None, session_id: Optional[str] = None):
+        """Save the changed keys of a session's state (all of `self.state` by default)"""
+        self.state_store.update(session_id or self.session_id, self.state if changes is None else changes)
 
     def setup_functions(self):
         """Configure agent functions - customize this based on your needs"""
@@ -54,40 +66,128 @@ class AgentRunner:
             # Example: Set up Twitter functions
             self.agent.use_default_twitter_functions(["wait", "reply_tweet"])
             
-    def run_forever(self, interval: int = 60):
+    def run_forever(self, interval: Optional[int] = 60):
         """Run the agent in an infinite loop"""
+        self.run_sessions([self.session_id], interval=interval)
+
+    def run_sessions(self, session_ids: Iterable[str], interval: Optional[int] = None,
+                     max_concurrency: int = 100):
+        """
+        Run many sessions concurrently until interrupted. Each session runs
+        every `interval` seconds, or on the agent's heartbeat if None.
+        """
         self.setup_functions()
-        
+
         print(f"Starting agent loop for platform: {self.platform}")
-        print(f"Session ID: {self.session_id}")
-        
-        while True:
-            try:
-                if self.platform == "twitter":
-                    response = self.agent.simulate_twitter(self.session_id)
-                else:
-                    # For other platforms, use the react method
-                    response = self.agent.react(
-                        session_id=self.session_id,
-                        platform=self.platform,
-                        task="Monitor and engage with users appropriately",
-                        event=None  # You might want to fetch events from your platform here
-                    )
-                
-                # Process response if needed
-                print(f"Agent response: {response}")
-                
-                # Save state
-                self.state['last_response'] = response
-                self.state['last_run'] = time.time()
-                self.save_state()
-                
-                # Wait before next iteration
-                time.sleep(interval)
-                
-            except Exception as e:
-                print(f"Error in agent loop: {e}")
-                time.sleep(interval)  # Continue loop even after error
+
+        scheduler = SessionScheduler(
+            self.agent,
+            max_concurrency=max_concurrency,
+            on_result=self._on_result,
+            on_error=self._on_error
+        )
+        for session_id in session_ids:
+            print(f"Session ID: {session_id}")
+            scheduler.add_session(
+                session_id,
+                self.platform,
+                # For other platforms, use the react method
+                task=None if self.platform == "twitter" else "Monitor and engage with users appropriately",
+                event=None,  # You might want to pass a callable fetching events from your platform here
+                interval=interval
+            )
+
+        try:
+            asyncio.run(scheduler.run())
+        finally:
+            self.state_store.close()
+
+    def run_telegram_updates(self, workers: int = 8):
+        """
+        React to incoming Telegram messages as they arrive instead of on a
+        timer. Each chat is its own session; the polling offset is kept in
+        the state store so a restart does not skip or replay messages.
+        """
+        from virtuals_sdk.ingest.telegram import TelegramUpdateIngestor
+
+        self.setup_functions()
+
+        print("Starting Telegram update ingestion")
+
+        ingestor = TelegramUpdateIngestor(
+            self.agent,
+            os.getenv("TELEGRAM_BOT_TOKEN"),
+            workers=workers,
+            state_store=self.state_store,
+            on_result=lambda session_id, update, response: self.save_state(
+                {'last_response': response, 'last_run': time.time()}, session_id=session_id)
+        )
+        try:
+            ingestor.run()
+        finally:
+            self.state_store.close()
+
+    def run_sharded(self, session_ids: Iterable[str], processes: Optional[int] = None,
+                    interval: Optional[int] = None, max_concurrency: int = 100):
+        """
+        Like `run_sessions`, but spread over `processes` worker processes
+        (one per CPU by default) to use every core. Each worker builds its
+        own agent with `setup_functions`, on a copy of this runner; results
+        come back to this process, which alone writes the state store. The
+        runner's attributes other than `agent` and `state_store` are copied
+        to the workers, so they must be picklable.
+        """
+        print(f"Starting sharded agent loop for platform: {self.platform}")
+
+        scheduler = ShardedScheduler(
+            functools.partial(_runner_agent, self),
+            processes=processes,
+            max_concurrency=max_concurrency,
+            on_result=self._on_session_result,
+            on_error=self._on_session_error
+        )
+        for session_id in session_ids:
+            scheduler.add_session(
+                session_id,
+                self.platform,
+                task=None if self.platform == "twitter" else "Monitor and engage with users appropriately",
+                interval=interval
+            )
+
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print(f"Sharded agent loop stopped: {scheduler.stats()}")
+            self.state_store.close()
+
+    def _on_result(self, session: ScheduledSession, response: Any):
+        self._on_session_result(session.session_id, response)
+
+    def _on_error(self, session: ScheduledSession, error: BaseException):
+        self._on_session_error(session.session_id, error)
+
+    def _on_session_result(self, session_id: str, response: Any):
+        # Process response if needed
+        print(f"Agent response: {response}")
+
+        # Save state, writing only what changed
+        changes = {'last_response': response, 'last_run': time.time()}
+        if session_id == self.session_id:
+            self.state.update(changes)
+        self.save_state(changes, session_id=session_id)
+
+    def _on_session_error(self, session_id: str, error: BaseException):
+        # Continue loop even after error
+        print(f"Error in agent loop for session {session_id}: {error}")
+
+
+def _runner_agent(runner: AgentRunner) -> Agent:
+    """Build a worker process's agent from a copy of the runner, set up by its `setup_functions`"""
+    runner.agent = Agent(**runner.agent_config)
+    runner.setup_functions()
+    return runner.agent
 
 def main():
     # Initialize and run agent
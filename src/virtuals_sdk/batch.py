@@ -0,0 +1,114 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional, Union, Tuple
+
+
+@dataclass
+class ReactRequest:
+    """A single `Agent.react` call in a batch"""
+    session_id: str
+    event: str = None
+    task: str = None
+    tweet_id: str = None
+    platform: str = None
+    delivery_id: str = None
+
+
+@dataclass
+class BatchResult:
+    """
+    Outcome of one item of a batch. Exactly one of `result` and `error`
+    is set; a failing item never aborts the rest of the batch.
+    """
+    request: Any
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def as_react_request(item: Union[ReactRequest, Tuple, dict]) -> ReactRequest:
+    """Accept a ReactRequest, a (session_id, event, task) tuple or a dict of ReactRequest fields"""
+    if isinstance(item, ReactRequest):
+        return item
+    if isinstance(item, dict):
+        return ReactRequest(**item)
+    if isinstance(item, (tuple, list)):
+        return ReactRequest(*item)
+    raise TypeError(f"Cannot build a ReactRequest from {type(item).__name__}")
+
+
+def run_concurrently(fn: Callable[[Any], Any], items: Iterable[Any], max_concurrency: int = 8) -> Iterator[BatchResult]:
+    """
+    Call `fn` on every item using a thread pool, keeping at most
+    `max_concurrency` calls in flight, and yield results as they complete.
+
+    `items` is consumed lazily, so it may be a generator of unbounded size.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        in_flight = {}
+
+        def submit_next() -> bool:
+            for item in items:
+                in_flight[executor.submit(fn, item)] = item
+                return True
+            return False
+
+        for _ in range(max_concurrency):
+            if not submit_next():
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = in_flight.pop(future)
+                submit_next()
+                error = future.exception()
+                if error is None:
+                    yield BatchResult(item, result=future.result())
+                else:
+                    yield BatchResult(item, error=error)
+
+
+async def arun_concurrently(fn: Callable[[Any], Awaitable[Any]], items: Iterable[Any], max_concurrency: int = 64) -> AsyncIterator[BatchResult]:
+    """
+    asyncio counterpart of `run_concurrently`: await `fn` on every item
+    with at most `max_concurrency` coroutines in flight.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    items = iter(items)
+    in_flight = {}
+
+    def submit_next() -> bool:
+        for item in items:
+            in_flight[asyncio.ensure_future(fn(item))] = item
+            return True
+        return False
+
+    for _ in range(max_concurrency):
+        if not submit_next():
+            break
+
+    try:
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = in_flight.pop(task)
+                submit_next()
+                error = task.exception()
+                if error is None:
+                    yield BatchResult(item, result=task.result())
+                else:
+                    yield BatchResult(item, error=error)
+    finally:
+        for task in in_flight:
+            task.cancel()
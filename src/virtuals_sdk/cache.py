@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+
+class FunctionCatalogCache:
+    """
+    Cache for the default function catalog returned by `GameSDK.functions`.
+
+    Entries are served from memory for `ttl` seconds. When `path` is given
+    the catalog is also persisted to disk, so a fresh process can start
+    without a network round trip. Once an entry expires it is kept as a
+    stale copy and revalidated with its ETag (`If-None-Match`) where the
+    server supports it.
+
+    Example:
+        cache = FunctionCatalogCache(ttl=3600, path="~/.cache/virtuals/functions.json")
+        sdk = GameSDK(api_key, functions_cache=cache)
+    """
+
+    def __init__(self, ttl: float = 300, path: Optional[str] = None):
+        """
+        Args:
+            ttl (float): Seconds a fetched catalog is served without revalidation
+            path (str): Optional file to persist the catalog to
+        """
+        self.ttl = ttl
+        self.path = os.path.expanduser(path) if path else None
+        self._lock = threading.Lock()
+        self._functions: Optional[Dict[str, str]] = None
+        self._etag: Optional[str] = None
+        self._fetched_at = 0.0
+        self._loaded = False
+
+    def get(self) -> Optional[Dict[str, str]]:
+        """Get the cached catalog if it is still fresh, else None"""
+        with self._lock:
+            self._load()
+            if self._functions is None or time.time() - self._fetched_at > self.ttl:
+                return None
+            return dict(self._functions)
+
+    @property
+    def etag(self) -> Optional[str]:
+        """ETag of the cached (possibly stale) catalog, for conditional requests"""
+        with self._lock:
+            self._load()
+            return self._etag if self._functions is not None else None
+
+    def store(self, functions: Dict[str, str], etag: Optional[str] = None):
+        """Store a freshly fetched catalog"""
+        with self._lock:
+            self._loaded = True
+            self._functions = dict(functions)
+            self._etag = etag
+            self._fetched_at = time.time()
+            self._save()
+
+    def revalidated(self) -> Optional[Dict[str, str]]:
+        """
+        Mark the stale copy as fresh again after the server answered
+        `304 Not Modified`. Returns the catalog, or None if it was
+        invalidated in the meantime.
+        """
+        with self._lock:
+            if self._functions is None:
+                return None
+            self._fetched_at = time.time()
+            self._save()
+            return dict(self._functions)
+
+    def invalidate(self):
+        """Drop the cached catalog from memory and disk"""
+        with self._lock:
+            self._loaded = True
+            self._functions = None
+            self._etag = None
+            self._fetched_at = 0.0
+            if self.path:
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self._functions = data["functions"]
+            self._etag = data.get("etag")
+            self._fetched_at = data.get("fetched_at", 0.0)
+        except (OSError, ValueError, KeyError, TypeError):
+            # a missing or corrupt cache file is just a cache miss
+            self._functions = None
+
+    def _save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # write to a temporary file first so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".functions-")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({
+                    "functions": self._functions,
+                    "etag": self._etag,
+                    "fetched_at": self._fetched_at
+                }, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
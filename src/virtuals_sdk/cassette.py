@@ -0,0 +1,321 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from requests.structures import CaseInsensitiveDict
+from virtuals_sdk import codec
+from virtuals_sdk.transport import HTTPTransport, AsyncHTTPTransport, default_transport
+
+MODES = ("record", "replay", "once")
+# response headers the SDK looks at; everything else is left out of cassettes
+RECORDED_HEADERS = ("Content-Type", "ETag", "Retry-After", "X-RateLimit-Remaining", "X-RateLimit-Reset",
+                    "X-RateLimit-Reset-After", "X-RateLimit-Bucket")
+# credentials carried in URLs, replaced before a URL is stored or hashed:
+# Telegram bot tokens and Discord webhook tokens. Extend it, or pass
+# `redact` to a Cassette, for other secrets
+REDACTED_URL_PATTERNS: List[Tuple[Pattern, str]] = [
+    (re.compile(r"(//api\.telegram\.org(?::\d+)?/(?:file/)?bot)[^/?#]+"), r"\1<token>"),
+    (re.compile(r"(//(?:[\w-]+\.)?discord(?:app)?\.com/api(?:/v\d+)?/webhooks/[^/?#]+/)[^/?#]+"), r"\1<token>"),
+]
+
+# headers masked wherever they show up in a request body, e.g. in the
+# headersString of a custom function shipped to GAME
+REDACTED_HEADERS = ("Authorization",)
+_HEADERS_IN_STRING = re.compile(
+    r'("(?:%s)"\s*:\s*")(?:[^"\\]|\\.)*(")' % "|".join(map(re.escape, REDACTED_HEADERS)), re.IGNORECASE)
+_REDACTED_HEADER_NAMES = frozenset(name.lower() for name in REDACTED_HEADERS)
+
+
+def redact_url(url: str) -> str:
+    """`url` with the secrets matched by REDACTED_URL_PATTERNS replaced"""
+    for pattern, replacement in REDACTED_URL_PATTERNS:
+        url = pattern.sub(replacement, url)
+    return url
+
+
+def redact_body(body: Any, redact: Callable[[str], str] = redact_url) -> Any:
+    """
+    A decoded JSON body with `redact` applied to every string in it and
+    the REDACTED_HEADERS masked, both as keys and inside JSON strings
+    """
+    if isinstance(body, str):
+        return _HEADERS_IN_STRING.sub(r"\1<token>\2", redact(body))
+    if isinstance(body, dict):
+        return {key: "<token>" if str(key).lower() in _REDACTED_HEADER_NAMES else redact_body(value, redact)
+                for key, value in body.items()}
+    if isinstance(body, list):
+        return [redact_body(value, redact) for value in body]
+    return body
+
+
+class CassetteMiss(Exception):
+    """A request in replay mode that the cassette has no response for"""
+
+
+class CassetteResponse:
+    """A recorded response, with the parts of the `requests`/`httpx` response API the SDK uses"""
+    __slots__ = ("status_code", "content", "headers", "reason")
+
+    def __init__(self, status_code: int, content: bytes, headers: Dict[str, str], reason: str = ""):
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers)
+        self.reason = reason
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    @property
+    def reason_phrase(self) -> str:
+        return self.reason
+
+    def json(self) -> Any:
+        return codec.loads(self.content)
+
+
+def _decoded_body(body: Any, headers: Dict[str, str]) -> bytes:
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    elif not isinstance(body, (bytes, bytearray)):
+        # a form dict, as accepted by requests
+        body = urlencode(sorted(body.items()) if isinstance(body, dict) else body).encode("utf-8")
+    encoding = next((value for key, value in headers.items() if key.lower() == "content-encoding"), None)
+    if encoding == "gzip":
+        body = gzip.decompress(body)
+    elif encoding == "deflate":
+        body = zlib.decompress(body)
+    return bytes(body)
+
+
+def normalize_request(method: str, url: str, redact: Optional[Callable[[str], str]] = None, **kwargs) -> str:
+    """
+    The parts of a request that identify it, in a canonical form: the
+    method, the URL with its query parameters sorted, and the body
+    decompressed and, if it is JSON, with its keys sorted. Headers
+    (credentials, compression) and timeouts are ignored. With `redact`,
+    the URL and a JSON body are redacted first (see `redact_body`).
+    """
+    if redact is not None:
+        url = redact(url)
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    params = kwargs.get("params")
+    if params:
+        query.extend(params.items() if isinstance(params, dict) else params)
+    url = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(sorted(query)), ""))
+
+    if kwargs.get("json") is not None:
+        body = kwargs["json"]
+    else:
+        raw = _decoded_body(kwargs.get("content", kwargs.get("data")), kwargs.get("headers") or {})
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = base64.b64encode(raw).decode("ascii")
+    if redact is not None:
+        body = redact_body(body, redact)
+    return json.dumps([method.upper(), url, body], sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def request_key(method: str, url: str, redact: Optional[Callable[[str], str]] = None, **kwargs) -> str:
+    """Hash of the normalized request, see `normalize_request`"""
+    normalized = normalize_request(method, url, redact, **kwargs)
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _encode_body(content: bytes) -> Dict[str, str]:
+    try:
+        return {"body": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(entry: Dict[str, Any]) -> bytes:
+    if "body_b64" in entry:
+        return base64.b64decode(entry["body_b64"])
+    return entry.get("body", "").encode("utf-8")
+
+
+class Cassette:
+    """
+    Recorded HTTP exchanges, indexed by the hash of the normalized request.
+
+    The file holds one JSON line per exchange (gzip-compressed when the
+    path ends in `.gz`). In "record" mode exchanges are appended to a new
+    file as they happen; in "replay" mode the file is loaded once and
+    responses are served from memory; "once" replays an existing file and
+    records otherwise. When the same request was recorded several times
+    (e.g. successive `simulate` steps), the responses are replayed in the
+    order they were recorded, the last one repeating. Request headers,
+    such as API keys, are never recorded. URLs and the strings in JSON
+    request bodies are passed through `redact` (see `redact_url` and
+    `redact_body`) before they are stored or matched, so cassettes
+    recorded with a real bot token replay with any other.
+
+    Example:
+        cassette = Cassette("tests/cassettes/simulate.jsonl.gz", mode="once")
+        agent = Agent(api_key, goal=goal, transport=CassetteTransport(cassette))
+    """
+
+    def __init__(self, path: str, mode: str = "once", redact: Callable[[str], str] = redact_url):
+        """
+        Args:
+            path (str): Cassette file
+            mode (str): "record", "replay" or "once" (replay if the file exists)
+            redact: Removes credentials from a URL or from a string in a request body
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}'. Available modes: {', '.join(MODES)}")
+        if mode == "once":
+            mode = "replay" if os.path.exists(path) else "record"
+        self.path = path
+        self.mode = mode
+        self.redact = redact
+        self._lock = threading.Lock()
+        self._responses: Dict[str, List[CassetteResponse]] = {}
+        self._played: Dict[str, int] = {}
+        self._file = None
+        self.hits = 0
+        self.misses = 0
+        if mode == "replay":
+            self._load()
+        else:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._file = gzip.open(path, 'wb') if path.endswith(".gz") else open(path, 'wb')
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    def _load(self):
+        opener = gzip.open if self.path.endswith(".gz") else open
+        with opener(self.path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = codec.loads(line)
+                response = CassetteResponse(entry["status"], _decode_body(entry), entry.get("headers") or {},
+                                            entry.get("reason", ""))
+                self._responses.setdefault(entry["key"], []).append(response)
+
+    def play(self, method: str, url: str, **kwargs) -> CassetteResponse:
+        """The recorded response to a request; raises CassetteMiss if there is none"""
+        key = request_key(method, url, self.redact, **kwargs)
+        url = self.redact(url)
+        with self._lock:
+            responses = self._responses.get(key)
+            if not responses:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded response for {method.upper()} {url} in {self.path}")
+            self.hits += 1
+            index = self._played.get(key, 0)
+            self._played[key] = index + 1
+            return responses[min(index, len(responses) - 1)]
+
+    def record(self, method: str, url: str, response, **kwargs):
+        """Append an exchange; `response` may be a `requests` or `httpx` response"""
+        headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+        entry = {
+            "key": request_key(method, url, self.redact, **kwargs),
+            "method": method.upper(),
+            "url": self.redact(url),
+            "status": response.status_code,
+            "reason": getattr(response, "reason", None) or getattr(response, "reason_phrase", "") or "",
+            "headers": headers,
+            **_encode_body(response.content),
+        }
+        line = codec.dumps(entry) + b"\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CassetteTransport(HTTPTransport):
+    """
+    HTTPTransport that records to or replays from a Cassette. Use it for
+    GameSDK/Agent and for the clients whose functions should be recorded.
+    """
+
+    def __init__(self, cassette: Cassette, transport: Optional[HTTPTransport] = None):
+        """
+        Args:
+            cassette (Cassette): Where exchanges are recorded to or replayed from
+            transport (HTTPTransport): Sends the requests while recording
+        """
+        self.cassette = cassette
+        self.transport = transport
+        self.timeout = None
+
+    def request(self, method: str, url: str, **kwargs):
+        if not self.cassette.recording:
+            return self.cassette.play(method, url, **kwargs)
+        response = (self.transport or default_transport()).request(method, url, **kwargs)
+        self.cassette.record(method, url, response, **kwargs)
+        return response
+
+    def warm_up(self, url: str) -> bool:
+        if not self.cassette.recording:
+            return True
+        return (self.transport or default_transport()).warm_up(url)
+
+    def close(self):
+        self.cassette.close()
+
+
+class AsyncCassetteTransport(AsyncHTTPTransport):
+    """AsyncHTTPTransport counterpart of CassetteTransport"""
+
+    def __init__(self, cassette: Cassette, transport: Optional[AsyncHTTPTransport] = None):
+        """
+        Args:
+            cassette (Cassette): Where exchanges are recorded to or replayed from
+            transport (AsyncHTTPTransport): Sends the requests while recording;
+                created on first use if None
+        """
+        self.cassette = cassette
+        self.transport = transport
+        self.timeout = None
+
+    def _recording_transport(self) -> AsyncHTTPTransport:
+        if self.transport is None:
+            self.transport = AsyncHTTPTransport()
+        return self.transport
+
+    async def request(self, method: str, url: str, **kwargs):
+        if not self.cassette.recording:
+            return self.cassette.play(method, url, **kwargs)
+        response = await self._recording_transport().request(method, url, **kwargs)
+        self.cassette.record(method, url, response, **kwargs)
+        return response
+
+    async def warm_up(self, url: str) -> bool:
+        if not self.cassette.recording:
+            return True
+        return await self._recording_transport().warm_up(url)
+
+    async def aclose(self):
+        if self.transport is not None:
+            await self.transport.aclose()
+        self.cassette.close()
@@ -0,0 +1,139 @@
+import json
+from typing import Any, Optional, Union
+
+
+class JSONCodec:
+    """
+    JSON encoding and decoding used for every request body and response
+    the SDK handles, backed by the standard library.
+
+    Output is compact and UTF-8 (non-ASCII characters are not escaped),
+    the same for every backend. Decoding errors raise ValueError.
+    """
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        """Compact JSON as UTF-8 bytes, e.g. for a request body"""
+        return self.dumps_str(obj).encode("utf-8")
+
+    def dumps_str(self, obj: Any) -> str:
+        """Compact JSON as a string"""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    def dumps_pretty(self, obj: Any, indent: int = 4) -> str:
+        """Indented JSON as a string, e.g. for files people read"""
+        return json.dumps(obj, indent=indent)
+
+    def loads(self, data: Union[bytes, bytearray, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """JSONCodec backed by orjson"""
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj, option=self._options)
+
+    def dumps_str(self, obj: Any) -> str:
+        return self._orjson.dumps(obj, option=self._options).decode("utf-8")
+
+    def dumps_pretty(self, obj: Any, indent: int = 4) -> str:
+        if indent != 2:
+            # orjson only indents by two spaces
+            return super().dumps_pretty(obj, indent)
+        return self._orjson.dumps(obj, option=self._options | self._orjson.OPT_INDENT_2).decode("utf-8")
+
+    def loads(self, data: Union[bytes, bytearray, str]) -> Any:
+        # orjson.JSONDecodeError is a ValueError
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    """JSONCodec backed by msgspec"""
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self._msgspec = msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def dumps_str(self, obj: Any) -> str:
+        return self._encoder.encode(obj).decode("utf-8")
+
+    def dumps_pretty(self, obj: Any, indent: int = 4) -> str:
+        return self._msgspec.json.format(self._encoder.encode(obj), indent=indent).decode("utf-8")
+
+    def loads(self, data: Union[bytes, bytearray, str]) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except self._msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+
+CODECS = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "json": JSONCodec,
+}
+
+
+def _best_codec() -> JSONCodec:
+    for factory in CODECS.values():
+        try:
+            return factory()
+        except ImportError:
+            continue
+    return JSONCodec()
+
+
+_codec: JSONCodec = _best_codec()
+
+
+def get_codec() -> JSONCodec:
+    """The codec in use: orjson, else msgspec, else the standard library"""
+    return _codec
+
+
+def set_codec(codec: Optional[Union[str, JSONCodec]]):
+    """
+    Choose the codec used by the whole SDK.
+
+    Args:
+        codec: "orjson", "msgspec", "json", a JSONCodec instance, or None
+            to go back to the fastest one installed
+    """
+    global _codec
+    if codec is None:
+        _codec = _best_codec()
+    elif isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown JSON codec '{codec}'. Available codecs: {', '.join(CODECS)}")
+        _codec = CODECS[codec]()
+    else:
+        _codec = codec
+
+
+def dumps(obj: Any) -> bytes:
+    return _codec.dumps(obj)
+
+
+def dumps_str(obj: Any) -> str:
+    return _codec.dumps_str(obj)
+
+
+def dumps_pretty(obj: Any, indent: int = 4) -> str:
+    return _codec.dumps_pretty(obj, indent)
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    return _codec.loads(data)
@@ -0,0 +1,54 @@
+import gzip
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+ENCODINGS = ("gzip", "deflate")
+
+
+@dataclass(frozen=True)
+class Compression:
+    """
+    Request-body compression for GAME API calls.
+
+    Bodies of at least `threshold` bytes are compressed with `encoding`
+    ("gzip" or "deflate") and sent with a matching Content-Encoding header.
+    Smaller bodies are sent as they are, since compressing them costs more
+    CPU than it saves bandwidth. The server must accept compressed bodies.
+    """
+    encoding: str = "gzip"
+    threshold: int = 1024
+    level: int = 6
+
+    def __post_init__(self):
+        if self.encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding '{self.encoding}'. Available encodings: {', '.join(ENCODINGS)}")
+
+    def compress(self, body: bytes) -> Optional[bytes]:
+        """The compressed body, or None when it should be sent uncompressed"""
+        if len(body) < self.threshold:
+            return None
+        if self.encoding == "gzip":
+            # a fixed mtime keeps identical bodies byte-identical
+            compressed = gzip.compress(body, compresslevel=self.level, mtime=0)
+        else:
+            compressed = zlib.compress(body, self.level)
+        return compressed if len(compressed) < len(body) else None
+
+
+def compress_request(compression: Optional[Compression], kwargs: Dict) -> Tuple[Dict, Optional[int]]:
+    """
+    Compress the `content` of request keyword arguments.
+
+    Returns the keyword arguments to send and the uncompressed body size
+    (None when the body was left uncompressed).
+    """
+    body = kwargs.get("content")
+    if compression is None or not isinstance(body, (bytes, bytearray)):
+        return kwargs, None
+    compressed = compression.compress(body)
+    if compressed is None:
+        return kwargs, None
+    headers = dict(kwargs.get("headers") or {})
+    headers["Content-Encoding"] = compression.encoding
+    return {**kwargs, "content": compressed, "headers": headers}, len(body)
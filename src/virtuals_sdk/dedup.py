@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+def event_key(session_id: str, platform: str, tweet_id: Optional[str] = None, event: Optional[str] = None,
+              delivery_id: Optional[str] = None) -> str:
+    """
+    Idempotency key of a react call; the task is left out, as it may differ
+    between deliveries. A `delivery_id` (Telegram update id, Discord message
+    id) identifies the event in place of its text, so the same text sent
+    twice is two events while a redelivery of either is a duplicate.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    identity = f"id:{delivery_id}" if delivery_id is not None else f"event:{event or ''}"
+    for part in (session_id, platform.lower(), tweet_id or "", identity):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class _InFlight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ReactDeduplicator:
+    """
+    Idempotency layer for `Agent.react`/`areact`.
+
+    Platforms redeliver events (Telegram and Discord retries, at-least-once
+    queues), and every duplicate would cost a full GAME API call. Results
+    are remembered for `ttl` seconds, keyed by session, platform and the
+    delivery id when one is given. Without a delivery id, the event or
+    tweet id is hashed instead. A duplicate gets the original result back
+    (the same object, so do not mutate it). A duplicate that
+    arrives while the original call is still running waits for it instead
+    of calling the API again. Failed calls are not remembered, so a retry
+    after an error goes through. At most `max_entries` results are kept,
+    least recently used first out.
+
+    Example:
+        agent = Agent(api_key, goal=goal, description=description, dedup=ReactDeduplicator(ttl=600))
+    """
+
+    def __init__(self, ttl: float = 600, max_entries: int = 100000):
+        """
+        Args:
+            ttl (float): Seconds a result is returned for duplicates
+            max_entries (int): Maximum number of results kept
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._async_in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _cached(self, key: str) -> Tuple[bool, Any]:
+        entry = self._results.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] < time.monotonic():
+            del self._results[key]
+            return False, None
+        self._results.move_to_end(key)
+        return True, entry[1]
+
+    def _store(self, key: str, result: Any):
+        self._results[key] = (time.monotonic() + self.ttl, result)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def call(self, key: str, react: Callable[[], Any]) -> Any:
+        """Return the remembered result for `key`, or call `react` once for it"""
+        with self._lock:
+            found, result = self._cached(key)
+            if found:
+                self.hits += 1
+                return result
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                self.misses += 1
+                in_flight = self._in_flight[key] = _InFlight()
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+
+        if not owner:
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.result
+
+        try:
+            in_flight.result = react()
+        except BaseException as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if in_flight.error is None:
+                    self._store(key, in_flight.result)
+                del self._in_flight[key]
+            in_flight.done.set()
+        return in_flight.result
+
+    async def acall(self, key: str, react: Callable[[], Awaitable[Any]]) -> Any:
+        """asyncio counterpart of `call`"""
+        with self._lock:
+            found, result = self._cached(key)
+            if found:
+                self.hits += 1
+                return result
+            in_flight = self._async_in_flight.get(key)
+            if in_flight is None:
+                self.misses += 1
+                in_flight = self._async_in_flight[key] = asyncio.get_event_loop().create_future()
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+
+        if not owner:
+            # shield: a cancelled duplicate must not cancel the original call
+            return await asyncio.shield(in_flight)
+
+        try:
+            result = await react()
+        except BaseException as e:
+            with self._lock:
+                del self._async_in_flight[key]
+            if isinstance(e, asyncio.CancelledError):
+                in_flight.cancel()
+            else:
+                in_flight.set_exception(e)
+                # retrieved here so an error nobody waited for is not logged as unhandled
+                in_flight.exception()
+            raise
+        with self._lock:
+            self._store(key, result)
+            del self._async_in_flight[key]
+        in_flight.set_result(result)
+        return result
+
+    def forget(self, key: str):
+        """Drop a remembered result, so the next call with `key` goes through"""
+        with self._lock:
+            self._results.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self.hits = self.misses = self.coalesced = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._results),
+                "in_flight": len(self._in_flight) + len(self._async_in_flight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
@@ -0,0 +1,225 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, TYPE_CHECKING
+from virtuals_sdk import codec
+
+if TYPE_CHECKING:
+    from virtuals_sdk.game import Function
+
+# arguments naming the conversation an action writes to; actions on the
+# same conversation are executed in order
+CHAT_ARGUMENTS = ("chat_id", "channel_id")
+
+
+def default_chat_key(function: "Function", args: Dict[str, Any]) -> Optional[Hashable]:
+    """The chat an action targets, or None for actions independent of every other"""
+    for name in CHAT_ARGUMENTS:
+        value = args.get(name)
+        if value is not None:
+            return (function.config.platform, str(value))
+    return None
+
+
+@dataclass
+class Action:
+    """One action chosen by GAME: a function name (or id) and its arguments"""
+    name: str
+    args: Any = None
+    fn_id: Optional[str] = None
+
+
+@dataclass
+class ActionResult:
+    """
+    Outcome of one action of a decision. `skipped` actions are not custom
+    functions of the agent (e.g. GAME's own functions) and were not run.
+    """
+    action: Action
+    function: Optional["Function"] = field(default=None, repr=False)
+    args: Dict[str, Any] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[BaseException] = None
+    feedback: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def skipped(self) -> bool:
+        return self.function is None and self.error is None
+
+
+def decision_actions(decision: Any) -> List[Action]:
+    """
+    The actions of a react response: the response itself or its "data",
+    holding one action or a list of them (directly or under "actions").
+    An action names its function in "fn_name", "action" or "name", and
+    may carry its id in "fn_id", and its arguments in "args" or "arguments"
+    """
+    if isinstance(decision, dict) and isinstance(decision.get("data"), (dict, list)):
+        decision = decision["data"]
+    if isinstance(decision, dict) and isinstance(decision.get("actions"), list):
+        decision = decision["actions"]
+    items = decision if isinstance(decision, list) else [decision]
+
+    actions = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        name = item.get("fn_name") or item.get("action") or item.get("name")
+        if not name and not item.get("fn_id"):
+            continue
+        args = item.get("args", item.get("arguments"))
+        actions.append(Action(name=name or "", args=args, fn_id=item.get("fn_id")))
+    return actions
+
+
+class ActionExecutor:
+    """
+    Runs the actions GAME decides on with the matching custom Functions.
+
+    Functions are indexed by `fn_name` and id once. The actions of a
+    decision are validated against the function's arguments and executed
+    concurrently, except that actions on the same chat (see
+    `default_chat_key`) run one after another in decision order. Every
+    action yields an ActionResult with the function's success or error
+    feedback, and `summarize` turns the results into text for the next
+    react call.
+
+    Example:
+        decision = agent.react(session_id, "telegram", event=event, task=task)
+        results = agent.execute_actions(decision, platform="telegram")
+        agent.react(session_id, "telegram", event=ActionExecutor.summarize(results), task=task)
+    """
+
+    def __init__(self, functions: Iterable["Function"], max_concurrency: int = 8,
+                 chat_key: Callable[["Function", Dict[str, Any]], Optional[Hashable]] = default_chat_key):
+        """
+        Args:
+            functions: Custom functions the actions may name
+            max_concurrency (int): Maximum number of actions executed at once
+            chat_key: Maps a function and its arguments to the chat the action
+                targets, or None when it can run alongside any other action
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.chat_key = chat_key
+        self.by_name: Dict[str, "Function"] = {}
+        self.by_id: Dict[str, "Function"] = {}
+        for function in functions:
+            if function.id in self.by_id:
+                raise ValueError(f"Duplicate function id {function.id} ({function.fn_name})")
+            self.by_id[function.id] = function
+            # functions of different platforms may share a name: the first
+            # one registered wins, like in the config order
+            self.by_name.setdefault(function.fn_name, function)
+
+    def resolve(self, action: Action) -> Optional["Function"]:
+        if action.fn_id is not None and action.fn_id in self.by_id:
+            return self.by_id[action.fn_id]
+        return self.by_name.get(action.name) or self.by_id.get(action.name)
+
+    @staticmethod
+    def arguments(function: "Function", args: Any) -> List[Any]:
+        """
+        The positional arguments for `function` from an action's arguments
+        (a dict by name, a list, or either as a JSON string); raises
+        ValueError/TypeError like calling the function would
+        """
+        if isinstance(args, str):
+            args = codec.loads(args) if args.strip() else {}
+        if args is None:
+            args = {}
+        if isinstance(args, (list, tuple)):
+            values = list(args)
+        elif isinstance(args, dict):
+            missing = [arg.name for arg in function.args if arg.name not in args]
+            if missing:
+                raise ValueError(f"Missing arguments for {function.fn_name}: {', '.join(missing)}")
+            values = [args[arg.name] for arg in function.args]
+        else:
+            raise TypeError(f"Arguments of {function.fn_name} must be an object or an array")
+        # checks the count and the types
+        function._validate_args(*values)
+        return values
+
+    def plan(self, decision: Any) -> Tuple[List[ActionResult], List[List[Tuple[ActionResult, List[Any]]]]]:
+        """
+        Resolve and validate the actions of a decision. Returns a result per
+        action, and the runnable ones grouped by chat, in decision order.
+        """
+        results: List[ActionResult] = []
+        groups: Dict[Any, List[Tuple[ActionResult, List[Any]]]] = {}
+        for index, action in enumerate(decision_actions(decision)):
+            result = ActionResult(action)
+            results.append(result)
+            function = self.resolve(action)
+            if function is None:
+                continue
+            result.function = function
+            try:
+                values = self.arguments(function, action.args)
+            except (ValueError, TypeError) as e:
+                result.error = e
+                result.feedback = function.feedback({}, error=e)
+                continue
+            result.args = {arg.name: value for arg, value in zip(function.args, values)}
+            key = self.chat_key(function, result.args)
+            # actions without a chat each get a group of their own
+            groups.setdefault(("action", index) if key is None else ("chat", key), []).append((result, values))
+        return results, list(groups.values())
+
+    def _finish(self, result: ActionResult, value: Any = None, error: Optional[BaseException] = None):
+        result.result = value
+        result.error = error
+        result.feedback = result.function.feedback(result.args, response=value, error=error)
+
+    def _run_group(self, group: List[Tuple[ActionResult, List[Any]]]):
+        for result, values in group:
+            try:
+                self._finish(result, result.function(*values))
+            except Exception as e:
+                self._finish(result, error=e)
+
+    def execute(self, decision: Any) -> List[ActionResult]:
+        """Execute the actions of a react response; returns their results in decision order"""
+        results, groups = self.plan(decision)
+        if len(groups) == 1 or self.max_concurrency == 1:
+            for group in groups:
+                self._run_group(group)
+        elif groups:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(groups))) as pool:
+                list(pool.map(self._run_group, groups))
+        return results
+
+    async def aexecute(self, decision: Any) -> List[ActionResult]:
+        """asyncio counterpart of `execute`, running the functions with `acall`"""
+        results, groups = self.plan(decision)
+        slots = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_group(group: List[Tuple[ActionResult, List[Any]]]):
+            for result, values in group:
+                async with slots:
+                    try:
+                        self._finish(result, await result.function.acall(*values))
+                    except Exception as e:
+                        self._finish(result, error=e)
+
+        await asyncio.gather(*[run_group(group) for group in groups])
+        return results
+
+    @staticmethod
+    def summarize(results: Iterable[ActionResult]) -> str:
+        """One line per executed action, e.g. as the event of the next react call"""
+        lines = []
+        for result in results:
+            if result.skipped:
+                continue
+            name = result.function.fn_name if result.function is not None else result.action.name
+            status = "succeeded" if result.ok else "failed"
+            detail = result.feedback or ("" if result.ok else str(result.error))
+            lines.append(f"{name} {status}: {detail}" if detail else f"{name} {status}")
+        return "\n".join(lines)
@@ -1,5 +1,315 @@
-from typing import Dict, List
-from virtuals_sdk.game import Function, FunctionConfig, FunctionArgument
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from virtuals_sdk.game import Function, FunctionArgument, FunctionDefinition, slotted
+from virtuals_sdk.batch import run_concurrently, arun_concurrently
+from virtuals_sdk.transport import HTTPTransport, AsyncHTTPTransport
+from virtuals_sdk.ratelimit import RateLimiter, DiscordRateLimiter
+
+# Discord epoch (2015-01-01) in milliseconds, used to read snowflake timestamps
+DISCORD_EPOCH = 1420070400000
+# bulk delete only accepts 2-100 messages younger than 14 days
+BULK_DELETE_MAX = 100
+BULK_DELETE_MAX_AGE = 14 * 24 * 60 * 60 - 60
+
+
+def snowflake_age(snowflake: str, now: Optional[float] = None) -> Optional[float]:
+    """Age in seconds of a Discord snowflake id, or None if it is not one"""
+    try:
+        created_ms = (int(snowflake) >> 22) + DISCORD_EPOCH
+    except (TypeError, ValueError):
+        return None
+    return (now if now is not None else time.time()) - created_ms / 1000
+
+
+class BulkDeleteError(Exception):
+    """
+    Some messages of a bulk delete were not deleted. `deleted` holds the
+    ids that were, `failed` the error per id that was not; `body` is what
+    the function's error feedback is rendered with.
+    """
+
+    def __init__(self, deleted: List[str], failed: Dict[str, str]):
+        by_error: Dict[str, List[str]] = {}
+        for message_id, error in failed.items():
+            by_error.setdefault(error, []).append(message_id)
+        details = "; ".join(f"{', '.join(ids)}: {error}" for error, ids in by_error.items())
+        message = f"{len(failed)} of {len(deleted) + len(failed)} messages not deleted ({details})"
+        super().__init__(message)
+        self.deleted = deleted
+        self.failed = failed
+        self.body = {"message": message, "deleted": deleted, "failed": failed}
+
+
+@slotted()
+@dataclass
+class BulkDeleteFunction(Function):
+    """
+    Deletes many messages with Discord's bulk-delete endpoint. IDs are
+    sent in chunks of 100; messages too old for bulk delete (and a
+    leftover chunk of one) go through `single_delete` one by one. Returns
+    the deleted ids, or raises BulkDeleteError if any message could not
+    be deleted.
+    """
+    single_delete: Optional[Function] = field(default=None, repr=False, compare=False)
+
+    def _plan(self, message_ids: List[str]):
+        recent, old = [], []
+        now = time.time()
+        for message_id in dict.fromkeys(str(x) for x in message_ids):
+            age = snowflake_age(message_id, now)
+            (old if age is not None and age > BULK_DELETE_MAX_AGE else recent).append(message_id)
+
+        chunks = [recent[i:i + BULK_DELETE_MAX] for i in range(0, len(recent), BULK_DELETE_MAX)]
+        singles = old + [chunk[0] for chunk in chunks if len(chunk) == 1]
+        return [chunk for chunk in chunks if len(chunk) > 1], singles
+
+    @staticmethod
+    def _result(deleted: List[str], failed: Dict[str, str]) -> Dict[str, Any]:
+        if failed:
+            raise BulkDeleteError(deleted, failed)
+        return {"deleted": deleted, "failed": failed}
+
+    def __call__(self, *args) -> Dict[str, Any]:
+        arg_dict = self._validate_args(*args)
+        channel_id = arg_dict["channel_id"]
+        chunks, singles = self._plan(arg_dict["message_ids"])
+        deleted, failed = [], {}
+
+        for chunk in chunks:
+            try:
+                self._execute({"channel_id": channel_id, "message_ids": chunk})
+                deleted.extend(chunk)
+            except Exception as e:
+                failed.update((message_id, str(e)) for message_id in chunk)
+
+        for message_id in singles:
+            try:
+                self.single_delete._execute({"channel_id": channel_id, "message_id": message_id})
+                deleted.append(message_id)
+            except Exception as e:
+                failed[message_id] = str(e)
+
+        return self._result(deleted, failed)
+
+    async def acall(self, *args) -> Dict[str, Any]:
+        arg_dict = self._validate_args(*args)
+        channel_id = arg_dict["channel_id"]
+        chunks, singles = self._plan(arg_dict["message_ids"])
+        deleted, failed = [], {}
+
+        for chunk in chunks:
+            try:
+                await self._aexecute({"channel_id": channel_id, "message_ids": chunk})
+                deleted.extend(chunk)
+            except Exception as e:
+                failed.update((message_id, str(e)) for message_id in chunk)
+
+        for message_id in singles:
+            try:
+                await self.single_delete._aexecute({"channel_id": channel_id, "message_id": message_id})
+                deleted.append(message_id)
+            except Exception as e:
+                failed[message_id] = str(e)
+
+        return self._result(deleted, failed)
+
+
+@slotted()
+@dataclass
+class BatchReactionFunction(Function):
+    """
+    Adds several reactions to one message. The reaction PUTs are
+    pipelined over up to `max_concurrency` connections; the rate limiter
+    spaces them out within the channel's reaction bucket.
+    """
+    max_concurrency: int = 4
+
+    def _reaction_args(self, arg_dict: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {"channel_id": arg_dict["channel_id"], "message_id": arg_dict["message_id"], "emoji": emoji}
+            for emoji in dict.fromkeys(arg_dict["emojis"])
+        ]
+
+    @staticmethod
+    def _summary(results) -> Dict[str, Any]:
+        added, failed = [], {}
+        for item in results:
+            if item.ok:
+                added.append(item.request["emoji"])
+            else:
+                failed[item.request["emoji"]] = str(item.error)
+        return {"added": added, "failed": failed}
+
+    def __call__(self, *args) -> Dict[str, Any]:
+        arg_dict = self._validate_args(*args)
+        return self._summary(run_concurrently(self._execute, self._reaction_args(arg_dict), self.max_concurrency))
+
+    async def acall(self, *args) -> Dict[str, Any]:
+        arg_dict = self._validate_args(*args)
+        return self._summary([
+            item async for item in arun_concurrently(self._aexecute, self._reaction_args(arg_dict), self.max_concurrency)
+        ])
+
+
+# definitions shared by the functions of every client; each client adds
+# its URL, its authorization header, transport and rate limiter
+_SEND_MESSAGE_ARGS = (
+    FunctionArgument(
+        name="channel_id",
+        description="ID of the Discord channel to send the message to.",
+        type="string",
+    ),
+    FunctionArgument(
+        name="content",
+        description="Content of the message to send.",
+        type="string",
+    ),
+)
+
+_ADD_REACTION_ARGS = (
+    FunctionArgument(
+        name="channel_id",
+        description="ID of the Discord channel containing the message.",
+        type="string",
+    ),
+    FunctionArgument(
+        name="message_id",
+        description="ID of the message to add a reaction to.",
+        type="string",
+    ),
+    FunctionArgument(
+        name="emoji",
+        description="Emoji to add as a reaction (Unicode or custom emoji).",
+        type="string",
+    ),
+)
+
+_PIN_MESSAGE_ARGS = (
+    FunctionArgument(
+        name="channel_id",
+        description="ID of the Discord channel containing the message.",
+        type="string",
+    ),
+    FunctionArgument(
+        name="message_id",
+        description="ID of the message to pin.",
+        type="string",
+    ),
+)
+
+_DELETE_MESSAGE_ARGS = (
+    FunctionArgument(
+        name="channel_id",
+        description="ID of the Discord channel containing the message.",
+        type="string",
+    ),
+    FunctionArgument(
+        name="message_id",
+        description="ID of the message to delete.",
+        type="string",
+    ),
+)
+
+_BULK_DELETE_MESSAGES_ARGS = (
+    FunctionArgument(
+        name="channel_id",
+        description="ID of the Discord channel containing the messages.",
+        type="string",
+    ),
+    FunctionArgument(
+        name="message_ids",
+        description="IDs of the messages to delete.",
+        type="array",
+    ),
+)
+
+_ADD_REACTIONS_ARGS = (
+    FunctionArgument(
+        name="channel_id",
+        description="ID of the Discord channel containing the message.",
+        type="string",
+    ),
+    FunctionArgument(
+        name="message_id",
+        description="ID of the message to add the reactions to.",
+        type="string",
+    ),
+    FunctionArgument(
+        name="emojis",
+        description="Emojis to add as reactions (Unicode or custom emoji).",
+        type="array",
+    ),
+)
+
+
+_SEND_MESSAGE = FunctionDefinition(
+    fn_name="send_message",
+    fn_description="Send a text message to a Discord channel.",
+    args=_SEND_MESSAGE_ARGS,
+    method="post",
+    payload={
+        "content": "{{content}}",
+    },
+    success_feedback="Message sent successfully.",
+    error_feedback="Failed to send message: {{response.message}}",
+    platform="discord",
+)
+
+_ADD_REACTION = FunctionDefinition(
+    fn_name="add_reaction",
+    fn_description="Add a reaction emoji to a message.",
+    args=_ADD_REACTION_ARGS,
+    method="put",
+    success_feedback="Reaction added successfully.",
+    error_feedback="Failed to add reaction: {{response.message}}",
+    platform="discord",
+)
+
+_PIN_MESSAGE = FunctionDefinition(
+    fn_name="pin_message",
+    fn_description="Pin a message in a Discord channel.",
+    args=_PIN_MESSAGE_ARGS,
+    method="put",
+    success_feedback="Message pinned successfully.",
+    error_feedback="Failed to pin message: {{response.message}}",
+    platform="discord",
+)
+
+_DELETE_MESSAGE = FunctionDefinition(
+    fn_name="delete_message",
+    fn_description="Delete a message from a Discord channel.",
+    args=_DELETE_MESSAGE_ARGS,
+    method="delete",
+    success_feedback="Message deleted successfully.",
+    error_feedback="Failed to delete message: {{response.message}}",
+    platform="discord",
+)
+
+_BULK_DELETE_MESSAGES = FunctionDefinition(
+    fn_name="bulk_delete_messages",
+    fn_description="Delete many messages from a Discord channel at once. Use for moderation sweeps instead of deleting messages one by one.",
+    args=_BULK_DELETE_MESSAGES_ARGS,
+    method="post",
+    payload={
+        "messages": "{{message_ids}}",
+    },
+    success_feedback="Messages deleted successfully.",
+    error_feedback="Failed to delete messages: {{response.message}}",
+    platform="discord",
+)
+
+_ADD_REACTIONS = FunctionDefinition(
+    fn_name="add_reactions",
+    fn_description="Add several reaction emojis to a message at once.",
+    args=_ADD_REACTIONS_ARGS,
+    method="put",
+    success_feedback="Reaction {{emoji}} added successfully.",
+    error_feedback="Failed to add reaction {{emoji}}: {{response.message}}",
+    platform="discord",
+)
+
+_REACTION_URL = "channels/{{channel_id}}/messages/{{message_id}}/reactions/{{emoji}}/@me"
 
 
 class DiscordClient:
@@ -13,20 +323,34 @@ class DiscordClient:
         send_message = client.get_function("send_message")
     """
 
-    def __init__(self, bot_token: str):
+    def __init__(self, bot_token: str, transport: Optional[HTTPTransport] = None,
+                 async_transport: Optional[AsyncHTTPTransport] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
         """
         Initialize the Discord client with a bot token.
 
         Args:
             bot_token (str): Your Discord bot token
+            transport (HTTPTransport): Connection pool the functions execute over.
+                Pass the same transport to several clients to share connections.
+            async_transport (AsyncHTTPTransport): Connection pool used by `Function.acall`
+            rate_limiter (RateLimiter): Limits shared by all functions of this bot.
+                Defaults to a DiscordRateLimiter; pass `RateLimiter()` to disable limiting.
         """
         self.bot_token = bot_token
+        self.transport = transport
+        self.async_transport = async_transport
+        self.rate_limiter = rate_limiter or DiscordRateLimiter()
+
+        delete_message = self._create_delete_message()
 
         self._functions: Dict[str, Function] = {
             "send_message": self._create_send_message(),
             "add_reaction": self._create_add_reaction(),
             "pin_message": self._create_pin_message(),
-            "delete_message": self._create_delete_message(),
+            "delete_message": delete_message,
+            "bulk_delete_messages": self._create_bulk_delete_messages(delete_message),
+            "add_reactions": self._create_add_reactions(),
         }
 
     @property
@@ -57,137 +381,30 @@ class DiscordClient:
             )
         return self._functions[fn_name]
 
-    def _create_send_message(self) -> Function:
+    def _for_client(self, definition: FunctionDefinition, endpoint: str, function_class=Function,
+                    **function_fields) -> Function:
+        """This client's function for a shared definition, authorized with its token"""
+        headers = {"Authorization": f"Bot {self.bot_token}"}
+        if definition.payload:
+            headers = {"Content-Type": "application/json", **headers}
+        return definition.for_client(self.create_api_url(endpoint), headers, self.transport, self.async_transport,
+                                     self.rate_limiter, function_class, **function_fields)
 
-        # Send Message Function
-        send_message = Function(
-            fn_name="send_message",
-            fn_description="Send a text message to a Discord channel.",
-            args=[
-                FunctionArgument(
-                    name="channel_id",
-                    description="ID of the Discord channel to send the message to.",
-                    type="string",
-                ),
-                FunctionArgument(
-                    name="content",
-                    description="Content of the message to send.",
-                    type="string",
-                ),
-            ],
-            config=FunctionConfig(
-                method="post",
-                url=self.create_api_url("channels/{{channel_id}}/messages"),
-                platform="discord",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bot {self.bot_token}",
-                },
-                payload={
-                    "content": "{{content}}",
-                },
-                success_feedback="Message sent successfully.",
-                error_feedback="Failed to send message: {{response.message}}",
-            ),
-        )
-
-        return send_message
+    def _create_send_message(self) -> Function:
+        return self._for_client(_SEND_MESSAGE, "channels/{{channel_id}}/messages")
 
     def _create_add_reaction(self) -> Function:
-
-        # Add Reaction Function
-        add_reaction = Function(
-            fn_name="add_reaction",
-            fn_description="Add a reaction emoji to a message.",
-            args=[
-                FunctionArgument(
-                    name="channel_id",
-                    description="ID of the Discord channel containing the message.",
-                    type="string",
-                ),
-                FunctionArgument(
-                    name="message_id",
-                    description="ID of the message to add a reaction to.",
-                    type="string",
-                ),
-                FunctionArgument(
-                    name="emoji",
-                    description="Emoji to add as a reaction (Unicode or custom emoji).",
-                    type="string",
-                ),
-            ],
-            config=FunctionConfig(
-                method="put",
-                url=self.create_api_url(
-                    "channels/{{channel_id}}/messages/{{message_id}}/reactions/{{emoji}}/@me"
-                ),
-                platform="discord",
-                headers={"Authorization": f"Bot {self.bot_token}"},
-                success_feedback="Reaction added successfully.",
-                error_feedback="Failed to add reaction: {{response.message}}",
-            ),
-        )
-
-        return add_reaction
+        return self._for_client(_ADD_REACTION, _REACTION_URL)
 
     def _create_pin_message(self) -> Function:
-
-        # Pin Message Function
-        pin_message = Function(
-            fn_name="pin_message",
-            fn_description="Pin a message in a Discord channel.",
-            args=[
-                FunctionArgument(
-                    name="channel_id",
-                    description="ID of the Discord channel containing the message.",
-                    type="string",
-                ),
-                FunctionArgument(
-                    name="message_id",
-                    description="ID of the message to pin.",
-                    type="string",
-                ),
-            ],
-            config=FunctionConfig(
-                method="put",
-                url=self.create_api_url("channels/{{channel_id}}/pins/{{message_id}}"),
-                platform="discord",
-                headers={"Authorization": f"Bot {self.bot_token}"},
-                success_feedback="Message pinned successfully.",
-                error_feedback="Failed to pin message: {{response.message}}",
-            ),
-        )
-
-        return pin_message
+        return self._for_client(_PIN_MESSAGE, "channels/{{channel_id}}/pins/{{message_id}}")
 
     def _create_delete_message(self) -> Function:
+        return self._for_client(_DELETE_MESSAGE, "channels/{{channel_id}}/messages/{{message_id}}")
+
+    def _create_bulk_delete_messages(self, delete_message: Function) -> Function:
+        return self._for_client(_BULK_DELETE_MESSAGES, "channels/{{channel_id}}/messages/bulk-delete",
+                                BulkDeleteFunction, single_delete=delete_message)
 
-        # Delete Message Function
-        delete_message = Function(
-            fn_name="delete_message",
-            fn_description="Delete a message from a Discord channel.",
-            args=[
-                FunctionArgument(
-                    name="channel_id",
-                    description="ID of the Discord channel containing the message.",
-                    type="string",
-                ),
-                FunctionArgument(
-                    name="message_id",
-                    description="ID of the message to delete.",
-                    type="string",
-                ),
-            ],
-            config=FunctionConfig(
-                method="delete",
-                url=self.create_api_url(
-                    "channels/{{channel_id}}/messages/{{message_id}}"
-                ),
-                platform="discord",
-                headers={"Authorization": f"Bot {self.bot_token}"},
-                success_feedback="Message deleted successfully.",
-                error_feedback="Failed to delete message: {{response.message}}",
-            ),
-        )
-
-        return delete_message
+    def _create_add_reactions(self) -> Function:
+        return self._for_client(_ADD_REACTIONS, _REACTION_URL, BatchReactionFunction)
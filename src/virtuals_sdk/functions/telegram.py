@@ -1,5 +1,177 @@
-from typing import Dict, List
-from virtuals_sdk.game import Function, FunctionConfig, FunctionArgument
+from typing import Dict, List, Optional
+from virtuals_sdk.game import Function, FunctionArgument, FunctionDefinition
+from virtuals_sdk.transport import HTTPTransport, AsyncHTTPTransport
+from virtuals_sdk.ratelimit import RateLimiter, TelegramRateLimiter
+
+# definitions shared by the functions of every client; each client adds
+# its own URL (with its token), transport and rate limiter
+_SEND_MESSAGE_ARGS = (
+    FunctionArgument(
+        name="chat_id",
+        description="Unique identifier for the target chat or username of the target channel",
+        type="string"
+    ),
+    FunctionArgument(
+        name="text",
+        description="Message text to send. Should be contextually relevant and maintain conversation flow.",
+        type="string"
+    )
+)
+
+_SEND_MEDIA_ARGS = (
+    FunctionArgument(
+        name="chat_id",
+        description="Target chat identifier where media will be sent",
+        type="string"
+    ),
+    FunctionArgument(
+        name="media_type",
+        description="Type of media to send: 'photo', 'document', 'video', 'audio'. Choose appropriate type for content.",
+        type="string"
+    ),
+    FunctionArgument(
+        name="media",
+        description="File ID or URL of the media to send. Ensure content is appropriate and relevant.",
+        type="string"
+    ),
+    FunctionArgument(
+        name="caption",
+        description="Optional text caption accompanying the media. Should provide context or explanation when needed, or follows up the conversation.",
+        type="string"
+    )
+)
+
+_CREATE_POLL_ARGS = (
+    FunctionArgument(
+        name="chat_id",
+        description="Chat where the poll will be created",
+        type="string"
+    ),
+    FunctionArgument(
+        name="question",
+        description="Main poll question. Should be clear and specific.",
+        type="string"
+    ),
+    FunctionArgument(
+        name="options",
+        description="List of answer options. Make options clear and mutually exclusive.",
+        type="array"
+    ),
+    FunctionArgument(
+        name="is_anonymous",
+        description="Whether poll responses are anonymous. Consider privacy and group dynamics.",
+        type="boolean"
+    )
+)
+
+_PIN_MESSAGE_ARGS = (
+    FunctionArgument(
+        name="chat_id",
+        description="Chat where the message will be pinned",
+        type="string"
+    ),
+    FunctionArgument(
+        name="message_id",
+        description="ID of the message to pin. Ensure message contains valuable information worth pinning.",
+        type="string"
+    ),
+    FunctionArgument(
+        name="disable_notification",
+        description="Whether to send notification about pinned message. Consider group size and message importance.",
+        type="boolean"
+    )
+)
+
+_DELETE_MESSAGE_ARGS = (
+    FunctionArgument(
+        name="chat_id",
+        description="Chat containing the message to delete",
+        type="string"
+    ),
+    FunctionArgument(
+        name="message_id",
+        description="ID of the message to delete. Consider impact before deletion.",
+        type="string"
+    )
+)
+
+
+_HEADERS = {"Content-Type": "application/json"}
+
+_SEND_MESSAGE = FunctionDefinition(
+    fn_name="send_message",
+    fn_description="Send a text message that is contextually appropriate and adds value to the conversation. Consider chat type (private/group) and ongoing discussion context.",
+    args=_SEND_MESSAGE_ARGS,
+    method="post",
+    payload={
+        "chat_id": "{{chat_id}}",
+        "text": "{{text}}",
+    },
+    success_feedback="Message sent successfully. Message ID: {{response.result.message_id}}",
+    error_feedback="Failed to send message: {{response.description}}",
+    platform="telegram"
+)
+
+_SEND_MEDIA = FunctionDefinition(
+    fn_name="send_media",
+    fn_description="Send a media message (photo, document, video, etc.) with optional caption. Use when visual or document content adds value to the conversation.",
+    args=_SEND_MEDIA_ARGS,
+    method="post",
+    payload={
+        "chat_id": "{{chat_id}}",
+        "{{media_type}}": "{{media}}",
+        "caption": "{{caption}}"
+    },
+    success_feedback="Media sent successfully. Type: {{media_type}}, Message ID: {{response.result.message_id}}",
+    error_feedback="Failed to send media: {{response.description}}",
+    platform="telegram"
+)
+
+_CREATE_POLL = FunctionDefinition(
+    fn_name="create_poll",
+    fn_description="Create an interactive poll to gather user opinions or make group decisions. Useful for engagement and collecting feedback.",
+    args=_CREATE_POLL_ARGS,
+    method="post",
+    payload={
+        "chat_id": "{{chat_id}}",
+        "question": "{{question}}",
+        "options": "{{options}}",
+        "is_anonymous": "{{is_anonymous}}",
+    },
+    success_feedback="Poll created successfully. Poll ID: {{response.result.poll.id}}",
+    error_feedback="Failed to create poll: {{response.description}}",
+    platform="telegram"
+)
+
+_PIN_MESSAGE = FunctionDefinition(
+    fn_name="pin_message",
+    fn_description="Pin an important message in a chat. Use for announcements, important information, or group rules.",
+    args=_PIN_MESSAGE_ARGS,
+    method="post",
+    payload={
+        "chat_id": "{{chat_id}}",
+        "message_id": "{{message_id}}",
+        "disable_notification": "{{disable_notification}}"
+    },
+    success_feedback="Message pinned successfully",
+    error_feedback="Failed to pin message: {{response.description}}",
+    platform="telegram"
+)
+
+_DELETE_MESSAGE = FunctionDefinition(
+    fn_name="delete_message",
+    fn_description="Delete a message from a chat. Use for moderation or cleaning up outdated information.",
+    args=_DELETE_MESSAGE_ARGS,
+    method="post",
+    payload={
+        "chat_id": "{{chat_id}}",
+        "message_id": "{{message_id}}"
+    },
+    success_feedback="Message deleted successfully",
+    error_feedback="Failed to delete message: {{response.description}}",
+    platform="telegram"
+)
+
 
 class TelegramClient:
     """
@@ -12,14 +184,24 @@ class TelegramClient:
         send_message = client.get_send_message_function()
     """
     
-    def __init__(self, bot_token: str):
+    def __init__(self, bot_token: str, transport: Optional[HTTPTransport] = None,
+                 async_transport: Optional[AsyncHTTPTransport] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
         """
         Initialize the Telegram client with a bot token.
         
         Args:
             bot_token (str): Your Telegram bot token
+            transport (HTTPTransport): Connection pool the functions execute over.
+                Pass the same transport to several clients to share connections.
+            async_transport (AsyncHTTPTransport): Connection pool used by `Function.acall`
+            rate_limiter (RateLimiter): Limits shared by all functions of this bot.
+                Defaults to a TelegramRateLimiter; pass `RateLimiter()` to disable limiting.
         """
         self.bot_token = bot_token
+        self.transport = transport
+        self.async_transport = async_transport
+        self.rate_limiter = rate_limiter or TelegramRateLimiter()
 
         self._functions: Dict[str, Function] = {
             "send_message": self._create_send_message(),
@@ -38,6 +220,11 @@ class TelegramClient:
         """Helper function to create full API URL with token"""
         return f"https://api.telegram.org/bot{self.bot_token}/{endpoint}"
 
+    def _for_client(self, definition: FunctionDefinition, endpoint: str) -> Function:
+        """This client's function for a shared definition"""
+        return definition.for_client(self.create_api_url(endpoint), dict(_HEADERS), self.transport,
+                                     self.async_transport, self.rate_limiter)
+
     def get_function(self, fn_name: str) -> Function:
         """
         Get a specific function by name.
@@ -56,204 +243,25 @@ class TelegramClient:
         return self._functions[fn_name]
 
     def _create_send_message(self) -> Function:
-  
         # Send Message Function
-        send_message = Function(
-            fn_name="send_message",
-            fn_description="Send a text message that is contextually appropriate and adds value to the conversation. Consider chat type (private/group) and ongoing discussion context.",
-            args=[
-                FunctionArgument(
-                    name="chat_id",
-                    description="Unique identifier for the target chat or username of the target channel",
-                    type="string"
-                ),
-                FunctionArgument(
-                    name="text",
-                    description="Message text to send. Should be contextually relevant and maintain conversation flow.",
-                    type="string"
-                )
-            ],
-            config=FunctionConfig(
-                method="post",
-                url=self.create_api_url("sendMessage"),
-                platform="telegram",
-                headers={"Content-Type": "application/json"},
-                payload={
-                    "chat_id": "{{chat_id}}",
-                    "text": "{{text}}",
-                },
-                success_feedback="Message sent successfully. Message ID: {{response.result.message_id}}",
-                error_feedback="Failed to send message: {{response.description}}"
-            )
-        )
-
-        return send_message
+        return self._for_client(_SEND_MESSAGE, "sendMessage")
 
 
     def _create_send_media(self) -> Function:
-
         # Reply with Media Function
-        send_media = Function(
-            fn_name="send_media",
-            fn_description="Send a media message (photo, document, video, etc.) with optional caption. Use when visual or document content adds value to the conversation.",
-            args=[
-                FunctionArgument(
-                    name="chat_id",
-                    description="Target chat identifier where media will be sent",
-                    type="string"
-                ),
-                FunctionArgument(
-                    name="media_type",
-                    description="Type of media to send: 'photo', 'document', 'video', 'audio'. Choose appropriate type for content.",
-                    type="string"
-                ),
-                FunctionArgument(
-                    name="media",
-                    description="File ID or URL of the media to send. Ensure content is appropriate and relevant.",
-                    type="string"
-                ),
-                FunctionArgument(
-                    name="caption",
-                    description="Optional text caption accompanying the media. Should provide context or explanation when needed, or follows up the conversation.",
-                    type="string"
-                )
-            ],
-            config=FunctionConfig(
-                method="post",
-                url=self.create_api_url("send{{media_type}}"),
-                platform="telegram",
-                headers={"Content-Type": "application/json"},
-                payload={
-                    "chat_id": "{{chat_id}}",
-                    "{{media_type}}": "{{media}}",
-                    "caption": "{{caption}}"
-                },
-                success_feedback="Media sent successfully. Type: {{media_type}}, Message ID: {{response.result.message_id}}",
-                error_feedback="Failed to send media: {{response.description}}"
-            )
-        )
-
-        return send_media
+        return self._for_client(_SEND_MEDIA, "send{{media_type}}")
 
     def _create_poll(self) -> Function:
-
         # Create Poll Function
-        create_poll = Function(
-            fn_name="create_poll",
-            fn_description="Create an interactive poll to gather user opinions or make group decisions. Useful for engagement and collecting feedback.",
-            args=[
-                FunctionArgument(
-                    name="chat_id",
-                    description="Chat where the poll will be created",
-                    type="string"
-                ),
-                FunctionArgument(
-                    name="question",
-                    description="Main poll question. Should be clear and specific.",
-                    type="string"
-                ),
-                FunctionArgument(
-                    name="options",
-                    description="List of answer options. Make options clear and mutually exclusive.",
-                    type="array"
-                ),
-                FunctionArgument(
-                    name="is_anonymous",
-                    description="Whether poll responses are anonymous. Consider privacy and group dynamics.",
-                    type="boolean"
-                )
-            ],
-            config=FunctionConfig(
-                method="post",
-                url=self.create_api_url("sendPoll"),
-                platform="telegram",
-                headers={"Content-Type": "application/json"},
-                payload={
-                    "chat_id": "{{chat_id}}",
-                    "question": "{{question}}",
-                    "options": "{{options}}",
-                    "is_anonymous": "{{is_anonymous}}",
-                },
-                success_feedback="Poll created successfully. Poll ID: {{response.result.poll.id}}",
-                error_feedback="Failed to create poll: {{response.description}}"
-            )
-        )
-
-        return create_poll
+        return self._for_client(_CREATE_POLL, "sendPoll")
     
     def _create_pin_message(self) -> Function:
-
         # Pin Message Function
-        pin_message = Function(
-            fn_name="pin_message",
-            fn_description="Pin an important message in a chat. Use for announcements, important information, or group rules.",
-            args=[
-                FunctionArgument(
-                    name="chat_id",
-                    description="Chat where the message will be pinned",
-                    type="string"
-                ),
-                FunctionArgument(
-                    name="message_id",
-                    description="ID of the message to pin. Ensure message contains valuable information worth pinning.",
-                    type="string"
-                ),
-                FunctionArgument(
-                    name="disable_notification",
-                    description="Whether to send notification about pinned message. Consider group size and message importance.",
-                    type="boolean"
-                )
-            ],
-            config=FunctionConfig(
-                method="post",
-                url=self.create_api_url("pinChatMessage"),
-                platform="telegram",
-                headers={"Content-Type": "application/json"},
-                payload={
-                    "chat_id": "{{chat_id}}",
-                    "message_id": "{{message_id}}",
-                    "disable_notification": "{{disable_notification}}"
-                },
-                success_feedback="Message pinned successfully",
-                error_feedback="Failed to pin message: {{response.description}}"
-            )
-        )
-
-        return pin_message
+        return self._for_client(_PIN_MESSAGE, "pinChatMessage")
 
     def _create_delete_message(self) -> Function:
-
         # Delete Message Function
-        delete_message = Function(
-            fn_name="delete_message",
-            fn_description="Delete a message from a chat. Use for moderation or cleaning up outdated information.",
-            args=[
-                FunctionArgument(
-                    name="chat_id",
-                    description="Chat containing the message to delete",
-                    type="string"
-                ),
-                FunctionArgument(
-                    name="message_id",
-                    description="ID of the message to delete. Consider impact before deletion.",
-                    type="string"
-                )
-            ],
-            config=FunctionConfig(
-                method="post",
-                url=self.create_api_url("deleteMessage"),
-                platform="telegram",
-                headers={"Content-Type": "application/json"},
-                payload={
-                    "chat_id": "{{chat_id}}",
-                    "message_id": "{{message_id}}"
-                },
-                success_feedback="Message deleted successfully",
-                error_feedback="Failed to delete message: {{response.description}}"
-            )
-        )
-
-        return delete_message
+        return self._for_client(_DELETE_MESSAGE, "deleteMessage")
 
 
     ## FAILS BECAUSE CHATS ARE USUALLY PRIVATE AND AGENTS (BOT TOKEN) CANNOT CHANGE PRIVATE CHAT TITLES
@@ -1,23 +1,106 @@
-from typing import List, Any, Dict, Optional, Union, Set
-from dataclasses import dataclass, asdict
-from string import Template
-import json
+from typing import List, Any, Dict, Optional, Union, Set, Iterable, Iterator, AsyncIterator, Sequence, Tuple, Type
+from dataclasses import dataclass, field, fields, asdict, InitVar
+from functools import lru_cache
+import asyncio
+import time
 import uuid
+import weakref
 import requests
-from virtuals_sdk import sdk
-
-
-@dataclass
+from virtuals_sdk import sdk, codec
+from virtuals_sdk.transport import HTTPTransport, AsyncHTTPTransport, default_transport, default_async_transport
+from virtuals_sdk.cache import FunctionCatalogCache
+from virtuals_sdk.compression import Compression
+from virtuals_sdk.dedup import ReactDeduplicator, event_key
+from virtuals_sdk.executor import ActionExecutor, ActionResult
+from virtuals_sdk.ratelimit import RateLimiter
+from virtuals_sdk.metrics import get_metrics_hook, record
+from virtuals_sdk.template import compile_template
+from virtuals_sdk.batch import ReactRequest, BatchResult, as_react_request, run_concurrently, arun_concurrently
+
+
+# namespace of the deterministic ids of function and argument definitions
+DEFINITION_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "https://github.com/Virtual-Protocol/virtuals-python")
+
+
+@lru_cache(maxsize=4096)
+def definition_id(*parts: str) -> str:
+    """A stable id for a definition, the same in every process and on every run"""
+    return str(uuid.uuid5(DEFINITION_NAMESPACE, "\0".join(parts)))
+
+
+def slotted(*extra: str):
+    """
+    Class decorator giving a dataclass `__slots__` for its fields and the
+    `extra` attribute names, so instances carry no `__dict__`. Equivalent
+    to `dataclass(slots=True)`, which needs Python 3.10.
+    """
+    def wrap(cls):
+        inherited = set()
+        for base in cls.__mro__[1:]:
+            inherited.update(getattr(base, "__slots__", ()))
+        names = tuple(name for name in dict.fromkeys([f.name for f in fields(cls)] + list(extra))
+                      if name not in inherited)
+
+        namespace = {key: value for key, value in cls.__dict__.items()
+                     if key not in names and key not in ("__dict__", "__weakref__")}
+        namespace["__slots__"] = names
+        if cls.__dataclass_params__.frozen:
+            # pickle would restore the fields with setattr, which frozen classes refuse
+            def __getstate__(self):
+                return tuple(getattr(self, f.name) for f in fields(self))
+
+            def __setstate__(self, state):
+                for f, value in zip(fields(self), state):
+                    object.__setattr__(self, f.name, value)
+                # recompute what is derived from the fields
+                post_init = getattr(self, "__post_init__", None)
+                if post_init is not None:
+                    post_init()
+
+            namespace["__getstate__"] = __getstate__
+            namespace["__setstate__"] = __setstate__
+        slotted_cls = type(cls)(cls.__name__, cls.__bases__, namespace)
+
+        # methods referring to the class (zero-argument super(), the frozen
+        # __setattr__) must see the new class, not the one it replaces
+        for value in namespace.values():
+            if isinstance(value, (classmethod, staticmethod)):
+                value = value.__func__
+            elif isinstance(value, property):
+                value = value.fget
+            for cell in getattr(value, "__closure__", None) or ():
+                try:
+                    if cell.cell_contents is cls:
+                        cell.cell_contents = slotted_cls
+                except ValueError:
+                    # an empty cell
+                    pass
+        return slotted_cls
+    return wrap
+
+
+@slotted()
+@dataclass(frozen=True, init=False)
 class FunctionArgument:
+    """
+    An argument of a Function. Immutable, so one definition can be shared
+    by the functions of many clients; its id is derived from its content
+    unless given.
+    """
     name: str
     description: str
     type: str
-    id: str = None
-    
-    def __post_init__(self):
-        self.id = self.id or str(uuid.uuid4())
+    # not an __init__ field, so `dataclasses.replace` derives it again for the new content
+    id: str = field(default=None, init=False)
 
+    def __init__(self, name: str, description: str, type: str, id: Optional[str] = None):
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "description", description)
+        object.__setattr__(self, "type", type)
+        object.__setattr__(self, "id", id or definition_id("argument", name, type, description))
 
+
+@slotted()
 @dataclass
 class FunctionConfig:
     method: str = "get"
@@ -32,25 +115,99 @@ class FunctionConfig:
     payloadString: str = "{}"  # Added field
     platform: str = None
 
-    def __post_init__(self):
+    # `payload` already serialized, e.g. by FunctionDefinition.for_client
+    serialized_payload: InitVar[Optional[str]] = None
+
+    def __post_init__(self, serialized_payload: Optional[str] = None):
         self.headers = self.headers or {}
         self.payload = self.payload or {}
 
-        self.headersString = json.dumps(self.headers, indent=4)
-        self.payloadString = json.dumps(self.payload, indent=4)
+        self.headersString = codec.dumps_str(self.headers)
+        self.payloadString = serialized_payload if serialized_payload is not None else codec.dumps_str(self.payload)
+
+    def toJson(self) -> Dict[str, Any]:
+        """Wire form of the config; headers and payload are only sent as their string copies"""
+        config = asdict(self)
+        del config["headers"]
+        del config["payload"]
+        return config
+
 
+def compile_payload(payload: Dict[str, Any]) -> Tuple[Tuple[Any, Any, bool], ...]:
+    """(key, value, is_template) per payload item; non-string values are sent as-is"""
+    return tuple(
+        (compile_template(key), compile_template(value), True) if isinstance(value, str) else (key, value, False)
+        for key, value in payload.items()
+    )
 
+
+@slotted("transport", "async_transport", "rate_limiter",
+         "_url_template", "_payload_templates", "_success_template", "_error_template")
 @dataclass
 class Function:
     fn_name: str
     fn_description: str
-    args: List[FunctionArgument]
+    args: Sequence[FunctionArgument]
     config: FunctionConfig
     hint: str = ""
     id: str = None
 
-    def __post_init__(self):
-        self.id = self.id or str(uuid.uuid4())
+    # the shared definition the function is built from, see FunctionDefinition.for_client
+    definition: InitVar[Optional["FunctionDefinition"]] = None
+
+    def __post_init__(self, definition: Optional["FunctionDefinition"] = None):
+        # the same function of different clients shares its id across runs
+        self.id = self.id or definition_id("function", self.config.platform or "", self.fn_name)
+        self.bind()
+        if definition is None:
+            self._compile_templates()
+        else:
+            # only the URL is the client's own; the rest is compiled once per definition
+            self._url_template = compile_template(self.config.url)
+            self._payload_templates = definition._payload_templates
+            self._success_template = definition._success_template
+            self._error_template = definition._error_template
+
+    def bind(self, transport: Optional[HTTPTransport] = None, async_transport: Optional[AsyncHTTPTransport] = None,
+             rate_limiter: Optional[RateLimiter] = None) -> "Function":
+        """
+        Set what the function executes with. These are not part of the
+        definition (fields, `asdict`, pickling), and default to none.
+
+        Args:
+            transport (HTTPTransport): Connection pool for calls; the shared one if None
+            async_transport (AsyncHTTPTransport): Connection pool for `acall`; the loop's shared one if None
+            rate_limiter (RateLimiter): Platform limits to respect; throttled calls
+                wait and retry instead of failing
+
+        Returns:
+            The function itself
+        """
+        self.transport = transport
+        self.async_transport = async_transport
+        self.rate_limiter = rate_limiter
+        return self
+
+    def __getstate__(self):
+        # only the definition: pools and limiters hold locks and belong to a client
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.bind()
+        self._compile_templates()
+
+    def _compile_templates(self):
+        """
+        Compile the URL, payload and feedback templates of the config once,
+        so calls only render them. Call again after mutating `config`.
+        """
+        config = self.config
+        self._url_template = compile_template(config.url)
+        self._payload_templates = compile_payload(config.payload)
+        self._success_template = compile_template(config.success_feedback or "")
+        self._error_template = compile_template(config.error_feedback or "")
 
     def toJson(self):
         return {
@@ -59,7 +216,7 @@ class Function:
             "fn_description": self.fn_description,
             "args": [asdict(arg) for arg in self.args],
             "hint": self.hint,
-            "config": asdict(self.config)
+            "config": self.config.toJson()
         }
 
     def _validate_args(self, *args) -> Dict[str, Any]:
@@ -84,37 +241,27 @@ class Function:
 
     def _interpolate_template(self, template_str: str, values: Dict[str, Any]) -> str:
         """Interpolate a template string with given values"""
-        # Convert Template-style placeholders ({{var}}) to Python style ($var)
-        python_style = template_str.replace('{{', '$').replace('}}', '')
-        return Template(python_style).safe_substitute(values)
+        return compile_template(template_str).render(values)
 
     def _prepare_request(self, arg_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare the request configuration with interpolated values"""
         config = self.config
 
-        # Interpolate URL
-        url = self._interpolate_template(config.url, arg_dict)
-
         # Interpolate payload
         payload = {}
-        for key, value in config.payload.items():
-            if isinstance(value, str):
-                # Handle template values
-                template_key = self._interpolate_template(key, arg_dict)
-                if value.strip('{}') in arg_dict:
-                    # For array and other non-string types, use direct value
-                    payload[template_key] = arg_dict[value.strip('{}')]
-                else:
-                    # For string interpolation
-                    payload[template_key] = self._interpolate_template(value, arg_dict)
+        for key, value, is_template in self._payload_templates:
+            if is_template:
+                # a value that is a single placeholder keeps the argument's
+                # type (arrays, booleans), anything else is string interpolated
+                payload[key.render(arg_dict)] = value.render_value(arg_dict)
             else:
                 payload[key] = value
 
         return {
             "method": config.method,
-            "url": url,
+            "url": self._url_template.render(arg_dict),
             "headers": config.headers,
-            "data": json.dumps(payload)
+            "data": codec.dumps(payload)
         }
 
     def __call__(self, *args):
@@ -122,36 +269,181 @@ class Function:
         # Validate and convert args to dictionary
         arg_dict = self._validate_args(*args)
 
+        return self._execute(arg_dict)
+
+    async def acall(self, *args):
+        """Execute the function without blocking the event loop"""
+        arg_dict = self._validate_args(*args)
+
+        return await self._aexecute(arg_dict)
+
+    def _execute(self, arg_dict: Dict[str, Any]):
+        """Send the request for already validated arguments"""
         # Prepare request
         request_config = self._prepare_request(arg_dict)
 
-        # Make the request
-        response = requests.request(**request_config)
+        # Make the request over a pooled connection
+        transport = self.transport or default_transport()
+        limiter = self.rate_limiter
+        metrics = get_metrics_hook()
+        attempt = 0
+        while True:
+            if limiter is not None:
+                wait = limiter.acquire(self, arg_dict)
+                if wait > 0:
+                    time.sleep(wait)
+            started = time.perf_counter() if metrics is not None else 0.0
+            try:
+                response = transport.request(**request_config)
+            except Exception as e:
+                if metrics is not None:
+                    record(metrics, "function", self.fn_name, started, request_config, error=e)
+                raise
+            if metrics is not None:
+                record(metrics, "function", self.fn_name, started, request_config, response=response)
+            # a throttled request blocks its bucket, so the next acquire waits it out
+            if limiter is None or limiter.observe(self, arg_dict, response) is None or attempt >= limiter.max_retries:
+                break
+            attempt += 1
+
+        return self._handle_response(response, arg_dict)
+
+    async def _aexecute(self, arg_dict: Dict[str, Any]):
+        """asyncio counterpart of `_execute`"""
+        request_config = self._prepare_request(arg_dict)
 
-        # Handle response
-        if response.ok:
+        transport = self.async_transport or default_async_transport()
+        limiter = self.rate_limiter
+        metrics = get_metrics_hook()
+        attempt = 0
+        while True:
+            if limiter is not None:
+                wait = limiter.acquire(self, arg_dict)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            started = time.perf_counter() if metrics is not None else 0.0
+            try:
+                response = await transport.request(**request_config)
+            except Exception as e:
+                if metrics is not None:
+                    record(metrics, "function", self.fn_name, started, request_config, error=e)
+                raise
+            if metrics is not None:
+                record(metrics, "function", self.fn_name, started, request_config, response=response)
+            if limiter is None or limiter.observe(self, arg_dict, response) is None or attempt >= limiter.max_retries:
+                break
+            attempt += 1
+
+        return self._handle_response(response, arg_dict)
+
+    def _handle_response(self, response, arg_dict: Dict[str, Any]):
+        """Turn a `requests` or `httpx` response into the call result"""
+        if response.status_code < 400:
             try:
-                result = response.json()
-            except requests.exceptions.JSONDecodeError:
+                result = codec.loads(response.content)
+            except ValueError:
                 result = response.text or None
             # Interpolate success feedback if provided
             if hasattr(self.config, 'success_feedback'):
-                print(self._interpolate_template(self.config.success_feedback, 
-                                              {"response": result, **arg_dict}))
+                print(self._success_template.render({"response": result, **arg_dict}))
             return result
         else:
             # Handle error
             try:
-                error_msg = response.json()
-            except requests.exceptions.JSONDecodeError:
-                error_msg = {"description": response.text or response.reason}
+                error_msg = codec.loads(response.content)
+            except ValueError:
+                reason = getattr(response, "reason", None) or getattr(response, "reason_phrase", "")
+                error_msg = {"description": response.text or reason}
             if hasattr(self.config, "error_feedback"):
-                print(
-                    self._interpolate_template(
-                        self.config.error_feedback, {"response": error_msg, **arg_dict}
-                    )
-                )
-            raise requests.exceptions.HTTPError(f"Request failed: {error_msg}")
+                print(self._error_template.render({"response": error_msg, **arg_dict}))
+            error = requests.exceptions.HTTPError(f"Request failed: {error_msg}", response=response)
+            # the parsed error, for rendering `error_feedback` later
+            error.body = error_msg
+            raise error
+
+    def feedback(self, arg_dict: Dict[str, Any], response: Any = None, error: Optional[BaseException] = None) -> str:
+        """The success feedback rendered with a call's result, or the error feedback for its error"""
+        if error is None:
+            return self._success_template.render({"response": response, **arg_dict})
+        body = getattr(error, "body", None)
+        if body is None:
+            body = {"description": str(error)}
+        return self._error_template.render({"response": body, **arg_dict})
+
+
+@slotted("payloadString", "_payload_templates", "_success_template", "_error_template")
+@dataclass(frozen=True)
+class FunctionDefinition:
+    """
+    The part of a Function that is the same for every client: name,
+    description, arguments, method, payload and feedback templates. It is
+    immutable and compiled once, and `for_client` builds a Function from it
+    that only adds the client's URL and headers (which carry its token)
+    and what it executes with. Each Function gets its own copy of
+    `payload`, but do not mutate the definition's.
+
+    Example:
+        SEND = FunctionDefinition("send", "Send a message", args, method="post", payload={"text": "{{text}}"})
+        send = SEND.for_client(f"https://example.com/{token}/send", {"Content-Type": "application/json"})
+    """
+    fn_name: str
+    fn_description: str
+    args: Sequence[FunctionArgument]
+    method: str = "get"
+    payload: Dict[str, Any] = None
+    success_feedback: str = ""
+    error_feedback: str = ""
+    platform: str = None
+    hint: str = ""
+
+    def __post_init__(self):
+        object.__setattr__(self, "args", tuple(self.args))
+        object.__setattr__(self, "payload", self.payload or {})
+        object.__setattr__(self, "payloadString", codec.dumps_str(self.payload))
+        object.__setattr__(self, "_payload_templates", compile_payload(self.payload))
+        object.__setattr__(self, "_success_template", compile_template(self.success_feedback or ""))
+        object.__setattr__(self, "_error_template", compile_template(self.error_feedback or ""))
+
+    def for_client(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        transport: Optional[HTTPTransport] = None,
+        async_transport: Optional[AsyncHTTPTransport] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        function_class: Type[Function] = Function,
+        **function_fields
+    ) -> Function:
+        """
+        Build a client's Function for this definition.
+
+        Args:
+            url (str): Request URL template, with the client's token if it has one in the URL
+            headers (dict): Request headers, e.g. with the client's authorization
+            transport, async_transport, rate_limiter: See `Function.bind`
+            function_class: Function subclass to build
+            function_fields: Further fields of `function_class`
+        """
+        config = FunctionConfig(
+            method=self.method,
+            url=url,
+            headers=headers,
+            payload=dict(self.payload),
+            serialized_payload=self.payloadString,
+            success_feedback=self.success_feedback,
+            error_feedback=self.error_feedback,
+            platform=self.platform
+        )
+        function = function_class(
+            fn_name=self.fn_name,
+            fn_description=self.fn_description,
+            args=self.args,
+            config=config,
+            hint=self.hint,
+            definition=self,
+            **function_fields
+        )
+        return function.bind(transport, async_transport, rate_limiter)
 
 
 class Agent:
@@ -162,9 +454,23 @@ class Agent:
         description: str = "",
         world_info: str = "",
         main_heartbeat: int = 15,
-        reaction_heartbeat: int = 5
+        reaction_heartbeat: int = 5,
+        transport: Optional[HTTPTransport] = None,
+        async_transport: Optional[AsyncHTTPTransport] = None,
+        functions_cache: Optional[FunctionCatalogCache] = None,
+        compression: Optional[Compression] = None,
+        dedup: Optional[ReactDeduplicator] = None
     ):
-        self.game_sdk = sdk.GameSDK(api_key)
+        self.game_sdk = sdk.GameSDK(api_key, transport=transport, functions_cache=functions_cache,
+                                    compression=compression)
+        self._async_transport = async_transport
+        # answers duplicate deliveries of an event without calling the API again
+        self.dedup = dedup
+        self._async_game_sdk: Optional[sdk.AsyncGameSDK] = None
+        # without an injected transport, connections belong to an event loop,
+        # so there is one asyncio client per running loop
+        self._loop_game_sdks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, sdk.AsyncGameSDK]" = \
+            weakref.WeakKeyDictionary()
         self.goal = goal
         self.description = description
         self.world_info = world_info
@@ -172,17 +478,136 @@ class Agent:
         self.custom_functions: List[Function] = []
         self.main_heartbeat = main_heartbeat
         self.reaction_heartbeat = reaction_heartbeat
+        # serialized configuration shipped on every call, rebuilt lazily
+        # after one of the setters below changes it
+        self._config_json: Optional[str] = None
+        # the same per react platform, with only the custom functions usable there
+        self._platform_config_json: Dict[str, str] = {}
+        self._functions_by_platform: Optional[Dict[Optional[str], List[Function]]] = None
+        # ActionExecutor per react platform (None: all custom functions)
+        self._executors: Dict[Optional[str], ActionExecutor] = {}
+
+    def _config(self, platform: Optional[str] = None) -> str:
+        """
+        Pre-serialized, compact configuration for simulate/react/deploy.
+        With a platform, only the custom functions for that platform (or
+        for no platform in particular) are included.
+        """
+        if platform is not None:
+            platform = platform.lower()
+            config = self._platform_config_json.get(platform)
+            if config is None:
+                config = self._platform_config_json[platform] = sdk.config_fragment(
+                    self.goal,
+                    self.description,
+                    self.world_info,
+                    self.enabled_functions,
+                    self.custom_functions_for(platform)
+                )
+            return config
+
+        config = self._config_json
+        if config is None:
+            config = self._config_json = sdk.config_fragment(
+                self.goal,
+                self.description,
+                self.world_info,
+                self.enabled_functions,
+                self.custom_functions
+            )
+        return config
+
+    def _invalidate_config(self):
+        self._config_json = None
+        self._platform_config_json = {}
+        self._functions_by_platform = None
+        self._executors = {}
+
+    def custom_functions_for(self, platform: str) -> List[Function]:
+        """
+        The custom functions the agent can use on `platform`: those tagged
+        with it (case-insensitively) and those without a platform tag
+        """
+        index = self._functions_by_platform
+        if index is None:
+            index = {None: []}
+            for function in self.custom_functions:
+                tag = function.config.platform.lower() if function.config.platform else None
+                if tag is None:
+                    # untagged functions are usable everywhere, in their original order
+                    for functions in index.values():
+                        functions.append(function)
+                else:
+                    index.setdefault(tag, list(index[None])).append(function)
+            self._functions_by_platform = index
+        return index.get(platform.lower(), index[None])
+
+    def executor(self, platform: Optional[str] = None) -> ActionExecutor:
+        """
+        ActionExecutor for the custom functions usable on `platform` (all of
+        them if None), rebuilt when the functions change
+        """
+        key = platform.lower() if platform is not None else None
+        executor = self._executors.get(key)
+        if executor is None:
+            functions = self.custom_functions if key is None else self.custom_functions_for(key)
+            executor = self._executors[key] = ActionExecutor(functions)
+        return executor
+
+    def execute_actions(self, decision: Any, platform: Optional[str] = None) -> List[ActionResult]:
+        """
+        Execute the custom functions chosen in a react response, see
+        ActionExecutor. Actions on different chats run concurrently.
+        """
+        return self.executor(platform).execute(decision)
+
+    async def aexecute_actions(self, decision: Any, platform: Optional[str] = None) -> List[ActionResult]:
+        """asyncio counterpart of `execute_actions`"""
+        return await self.executor(platform).aexecute(decision)
+
+    @property
+    def async_game_sdk(self) -> sdk.AsyncGameSDK:
+        """
+        asyncio client used by the `a*` methods, created on first use. Unless
+        an async transport was given, it is per event loop (so only available
+        while one runs) and sends over the loop's shared transport, so the
+        agent can be used from successive `asyncio.run` calls.
+        """
+        if self._async_transport is not None:
+            if self._async_game_sdk is None:
+                self._async_game_sdk = self._new_async_game_sdk(self._async_transport)
+            return self._async_game_sdk
+
+        loop = asyncio.get_running_loop()
+        game_sdk = self._loop_game_sdks.get(loop)
+        if game_sdk is None:
+            game_sdk = self._loop_game_sdks[loop] = self._new_async_game_sdk(default_async_transport())
+        return game_sdk
+
+    def _new_async_game_sdk(self, transport: AsyncHTTPTransport) -> sdk.AsyncGameSDK:
+        return sdk.AsyncGameSDK(
+            self.game_sdk.api_key,
+            transport=transport,
+            functions_cache=self.game_sdk.functions_cache,
+            retry_policies=self.game_sdk.retry_policies,
+            circuit_breaker=self.game_sdk.circuit_breaker,
+            metrics=self.game_sdk.metrics,
+            compression=self.game_sdk.compression
+        )
 
     def set_goal(self, goal: str):
         self.goal = goal
+        self._invalidate_config()
         return True
     
     def set_description(self, description: str):
         self.description = description
+        self._invalidate_config()
         return True
     
     def set_world_info(self, world_info: str):
         self.world_info = world_info
+        self._invalidate_config()
         return True
     
     def set_main_heartbeat(self, main_heartbeat: int):
@@ -215,15 +640,25 @@ class Agent:
         Enable built-in functions by default
         """
         self.enabled_functions = functions
+        self._invalidate_config()
         return True
 
     def add_custom_function(self, custom_function: Function) -> bool:
         """
         Add a custom function to the agent
         Custom functions are automatically added and enabled
+
+        Function ids are derived from the platform and the function name,
+        so the same function of two clients for one platform (e.g. two
+        Telegram bots) cannot be added to one agent: raises ValueError.
         """
+        for function in self.custom_functions:
+            if function.id == custom_function.id:
+                raise ValueError(
+                    f"A custom function with id {custom_function.id} ({custom_function.fn_name}) is already added")
         # Add to custom functions list
         self.custom_functions.append(custom_function)
+        self._invalidate_config()
 
         return True
 
@@ -231,44 +666,135 @@ class Agent:
         """
         Simulate the agent configuration for Twitter
         """
-        return self.game_sdk.simulate(
-            session_id,
-            self.goal,
-            self.description,
-            self.world_info,
-            self.enabled_functions,
-            self.custom_functions
-        )
+        return self.game_sdk.simulate(session_id, config=self._config())
 
-    def react(self, session_id: str, platform: str, tweet_id: str = None, event: str = None, task: str = None):
-        """
-        React to a tweet
-        """
-        return self.game_sdk.react(
-            session_id=session_id,
-            platform=platform,
-            event=event,
-            task=task,
-            tweet_id=tweet_id,
-            goal=self.goal,
-            description=self.description,
-            world_info=self.world_info,
-            functions=self.enabled_functions,
-            custom_functions=self.custom_functions
-        )
+    def react(self, session_id: str, platform: str, tweet_id: str = None, event: str = None, task: str = None,
+              delivery_id: str = None):
+        """
+        React to a tweet. `delivery_id` (e.g. a Telegram update id) identifies
+        the event for `dedup` instead of its text; it is not sent to the API.
+        """
+        def react():
+            return self.game_sdk.react(
+                session_id=session_id,
+                platform=platform,
+                event=event,
+                task=task,
+                tweet_id=tweet_id,
+                config=self._config(platform)
+            )
+
+        if self.dedup is None or (event is None and tweet_id is None and delivery_id is None):
+            return react()
+        return self.dedup.call(event_key(session_id, platform, tweet_id, event, delivery_id), react)
+
+    def react_many(self, requests: Iterable[Union[ReactRequest, tuple, dict]], platform: str = None,
+                   max_concurrency: int = 8) -> Iterator[BatchResult]:
+        """
+        React to a batch of events, e.g. one per chat, with at most
+        `max_concurrency` calls in flight. Results are yielded as they
+        complete (not in input order); a failing item is reported through
+        `BatchResult.error` without aborting the batch.
+
+        Each request is a ReactRequest, a (session_id, event, task) tuple or
+        a dict of ReactRequest fields, reported as given on its BatchResult.
+        `platform` is used for requests that do not set their own.
+        """
+        def call(item: Union[ReactRequest, tuple, dict]):
+            # converted here, so a malformed item fails on its own BatchResult
+            request = as_react_request(item)
+            return self.react(
+                session_id=request.session_id,
+                platform=self._batch_platform(request, platform),
+                tweet_id=request.tweet_id,
+                event=request.event,
+                task=request.task,
+                delivery_id=request.delivery_id
+            )
+
+        return run_concurrently(call, requests, max_concurrency)
+
+    def simulate_many(self, session_ids: Iterable[str], max_concurrency: int = 8) -> Iterator[BatchResult]:
+        """
+        Run `simulate_twitter` for many sessions concurrently, yielding a
+        BatchResult per session as it completes
+        """
+        return run_concurrently(self.simulate_twitter, session_ids, max_concurrency)
+
+    @staticmethod
+    def _batch_platform(request: ReactRequest, platform: Optional[str]) -> str:
+        platform = request.platform or platform
+        if not platform:
+            raise ValueError(f"No platform given for session '{request.session_id}'")
+        return platform
 
     def deploy_twitter(self):
         """
         Deploy the agent configuration
         """
         return self.game_sdk.deploy(
-            self.goal,
-            self.description,
-            self.world_info,
-            self.enabled_functions,
-            self.custom_functions,
-            self.main_heartbeat,
-            self.reaction_heartbeat
+            main_heartbeat=self.main_heartbeat,
+            reaction_heartbeat=self.reaction_heartbeat,
+            config=self._config()
+        )
+
+    async def asimulate_twitter(self, session_id: str):
+        """
+        Simulate the agent configuration for Twitter (asyncio)
+        """
+        return await self.async_game_sdk.simulate(session_id, config=self._config())
+
+    async def areact(self, session_id: str, platform: str, tweet_id: str = None, event: str = None, task: str = None,
+                     delivery_id: str = None):
+        """
+        React to a tweet (asyncio). `delivery_id` is used like in `react`.
+        """
+        def react():
+            return self.async_game_sdk.react(
+                session_id=session_id,
+                platform=platform,
+                event=event,
+                task=task,
+                tweet_id=tweet_id,
+                config=self._config(platform)
+            )
+
+        if self.dedup is None or (event is None and tweet_id is None and delivery_id is None):
+            return await react()
+        return await self.dedup.acall(event_key(session_id, platform, tweet_id, event, delivery_id), react)
+
+    def areact_many(self, requests: Iterable[Union[ReactRequest, tuple, dict]], platform: str = None,
+                    max_concurrency: int = 64) -> AsyncIterator[BatchResult]:
+        """
+        asyncio counterpart of `react_many`, to be consumed with `async for`
+        """
+        async def call(item: Union[ReactRequest, tuple, dict]):
+            request = as_react_request(item)
+            return await self.areact(
+                session_id=request.session_id,
+                platform=self._batch_platform(request, platform),
+                tweet_id=request.tweet_id,
+                event=request.event,
+                task=request.task,
+                delivery_id=request.delivery_id
+            )
+
+        return arun_concurrently(call, requests, max_concurrency)
+
+    def asimulate_many(self, session_ids: Iterable[str], max_concurrency: int = 64) -> AsyncIterator[BatchResult]:
+        """
+        asyncio counterpart of `simulate_many`, to be consumed with `async for`
+        """
+        return arun_concurrently(self.asimulate_twitter, session_ids, max_concurrency)
+
+    async def adeploy_twitter(self):
+        """
+        Deploy the agent configuration (asyncio)
+        """
+        return await self.async_game_sdk.deploy(
+            main_heartbeat=self.main_heartbeat,
+            reaction_heartbeat=self.reaction_heartbeat,
+            config=self._config()
         )
 
     def export(self) -> str:
@@ -290,7 +816,7 @@ class Agent:
                 for func in self.custom_functions
             ]
         }
-        agent_json = json.dumps(export_dict, indent=4)
+        agent_json = codec.dumps_pretty(export_dict, indent=4)
 
         # save to file
         with open('agent.json', 'w') as f:
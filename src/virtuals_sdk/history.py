@@ -0,0 +1,214 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Optional
+from virtuals_sdk import codec
+
+
+def approx_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token), cheap enough for every message"""
+    return (len(text) + 3) // 4
+
+
+def default_format(role: str, text: str) -> str:
+    return f"{role}: {text}"
+
+
+class SessionHistory:
+    """
+    The most recent messages of one session, kept within a message count
+    and a size budget.
+
+    Messages are stored as formatted lines together with their measured
+    size, so the oldest ones are dropped in O(1) as new ones arrive and
+    the rendered history is cached between messages rather than joined
+    again on every call.
+    """
+    __slots__ = ("lines", "costs", "cost", "_rendered")
+
+    def __init__(self):
+        self.lines: Deque[str] = deque()
+        self.costs: Deque[int] = deque()
+        self.cost = 0
+        self._rendered: Optional[str] = None
+
+    def append(self, line: str, cost: int, max_messages: int, budget: int, separator: str):
+        self.lines.append(line)
+        self.costs.append(cost)
+        self.cost += cost
+        dropped = 0
+        # keep at least the newest message, even when it alone is over budget
+        while len(self.lines) > 1 and (len(self.lines) > max_messages or self.cost > budget):
+            dropped += len(self.lines.popleft()) + len(separator)
+            self.cost -= self.costs.popleft()
+        if self._rendered is not None:
+            # extend the cached rendering instead of joining every line again
+            if len(self.lines) == 1:
+                self._rendered = line
+            else:
+                self._rendered = self._rendered[dropped:] + separator + line
+
+    def render(self, separator: str) -> str:
+        if self._rendered is None:
+            self._rendered = separator.join(self.lines)
+        return self._rendered
+
+
+class HistoryStore:
+    """
+    Bounded conversation history per session, rendered into `react` tasks.
+
+    Each session keeps at most `max_messages` messages, and only as many
+    recent ones as fit in `budget` as counted by `measure` (characters by
+    default; `approx_tokens` or a real tokenizer for a token budget). At
+    most `max_sessions` sessions are held in memory; the least recently
+    used one is evicted beyond that, and written to `spill_dir` when
+    given so that it is loaded back on its next message. Thread-safe.
+
+    Example:
+        history = HistoryStore(budget=2000, measure=approx_tokens)
+        task = history.render_task(session_id, "Reply to the user")
+        history.append(session_id, text, role="user")
+        agent.react(session_id=session_id, platform="telegram", event=text, task=task)
+    """
+
+    def __init__(
+        self,
+        max_messages: int = 50,
+        budget: int = 4000,
+        measure: Callable[[str], int] = len,
+        max_sessions: int = 10000,
+        spill_dir: Optional[str] = None,
+        format: Callable[[str, str], str] = default_format,
+        separator: str = "\n"
+    ):
+        """
+        Args:
+            max_messages (int): Messages kept per session
+            budget (int): Maximum size of a session's history, in `measure` units
+            measure: Size of a formatted message, e.g. `len` or `approx_tokens`
+            max_sessions (int): Sessions kept in memory
+            spill_dir (str): Directory evicted sessions are written to; dropped if None
+            format: Turns a role and a message text into one history line
+            separator (str): Put between the lines of a rendered history
+        """
+        if max_messages < 1 or max_sessions < 1:
+            raise ValueError("max_messages and max_sessions must be at least 1")
+        self.max_messages = max_messages
+        self.budget = budget
+        self.measure = measure
+        self.max_sessions = max_sessions
+        self.spill_dir = spill_dir
+        self.format = format
+        self.separator = separator
+        self._separator_cost = measure(separator)
+        self._sessions: "OrderedDict[str, SessionHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _spill_path(self, session_id: str) -> str:
+        name = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_dir, f"{name}.json")
+
+    def _session(self, session_id: str, create: bool) -> Optional[SessionHistory]:
+        history = self._sessions.get(session_id)
+        if history is not None:
+            self._sessions.move_to_end(session_id)
+            return history
+        history = self._load(session_id)
+        if history is None:
+            if not create:
+                return None
+            history = SessionHistory()
+        self._sessions[session_id] = history
+        while len(self._sessions) > self.max_sessions:
+            self._evict(*self._sessions.popitem(last=False))
+        return history
+
+    def _load(self, session_id: str) -> Optional[SessionHistory]:
+        if self.spill_dir is None:
+            return None
+        path = self._spill_path(session_id)
+        try:
+            with open(path, 'rb') as f:
+                lines = codec.loads(f.read())["lines"]
+        except FileNotFoundError:
+            return None
+        os.unlink(path)
+        history = SessionHistory()
+        for line in lines:
+            history.append(line, self.measure(line) + self._separator_cost, self.max_messages, self.budget,
+                           self.separator)
+        return history
+
+    def _evict(self, session_id: str, history: SessionHistory):
+        self.evictions += 1
+        if self.spill_dir is None or not history.lines:
+            return
+        with open(self._spill_path(session_id), 'wb') as f:
+            f.write(codec.dumps({"session": session_id, "lines": list(history.lines)}))
+
+    def append(self, session_id: str, text: str, role: Optional[str] = None):
+        """
+        Add a message to a session's history, formatted with its `role`
+        (e.g. "user" or the agent's name) when given
+        """
+        line = text if role is None else self.format(role, text)
+        cost = self.measure(line) + self._separator_cost
+        with self._lock:
+            self._session(session_id, create=True).append(
+                line, cost, self.max_messages, self.budget, self.separator)
+
+    def render(self, session_id: str) -> str:
+        """The session's history within the budget, oldest message first"""
+        with self._lock:
+            history = self._session(session_id, create=False)
+            return history.render(self.separator) if history is not None else ""
+
+    def render_task(self, session_id: str, instructions: Optional[str],
+                    heading: str = "Conversation history:") -> Optional[str]:
+        """A `react` task made of `instructions` followed by the session's history, if any"""
+        rendered = self.render(session_id)
+        if not rendered:
+            return instructions
+        if not instructions:
+            return f"{heading}\n{rendered}"
+        return f"{instructions}\n\n{heading}\n{rendered}"
+
+    def messages(self, session_id: str) -> List[str]:
+        """The formatted messages of a session, oldest first"""
+        with self._lock:
+            history = self._session(session_id, create=False)
+            return list(history.lines) if history is not None else []
+
+    def clear(self, session_id: str):
+        """Forget a session's history, in memory and on disk"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            if self.spill_dir is not None:
+                try:
+                    os.unlink(self._spill_path(session_id))
+                except FileNotFoundError:
+                    pass
+
+    def flush(self):
+        """Write every session in memory to `spill_dir`, e.g. before exiting"""
+        if self.spill_dir is None:
+            return
+        with self._lock:
+            while self._sessions:
+                self._evict(*self._sessions.popitem(last=False))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "messages": sum(len(history.lines) for history in self._sessions.values()),
+                "evictions": self.evictions,
+            }
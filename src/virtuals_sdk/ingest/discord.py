@@ -0,0 +1,350 @@
+import asyncio
+import inspect
+import random
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+from virtuals_sdk import codec
+from virtuals_sdk.history import HistoryStore
+
+if TYPE_CHECKING:
+    from virtuals_sdk.game import Agent
+
+GATEWAY_URL = "wss://gateway.discord.gg"
+GATEWAY_VERSION = 10
+
+# gateway opcodes
+DISPATCH = 0
+HEARTBEAT = 1
+IDENTIFY = 2
+RESUME = 6
+RECONNECT = 7
+INVALID_SESSION = 9
+HELLO = 10
+HEARTBEAT_ACK = 11
+
+# gateway intents
+GUILDS = 1 << 0
+GUILD_MESSAGES = 1 << 9
+DIRECT_MESSAGES = 1 << 12
+MESSAGE_CONTENT = 1 << 15
+DEFAULT_INTENTS = GUILD_MESSAGES | DIRECT_MESSAGES | MESSAGE_CONTENT
+
+# close codes after which reconnecting cannot help (bad token, bad intents, ...)
+FATAL_CLOSE_CODES = frozenset({4004, 4010, 4011, 4012, 4013, 4014})
+# close codes after which the session cannot be resumed
+NEW_SESSION_CLOSE_CODES = frozenset({4007, 4009})
+
+
+class GatewayError(Exception):
+    """The gateway closed the connection in a way reconnecting cannot fix"""
+
+    def __init__(self, message: str, close_code: Optional[int] = None):
+        super().__init__(message)
+        self.close_code = close_code
+
+
+class _Reconnect(Exception):
+    """Internal: drop the connection and reconnect (resuming if possible)"""
+
+
+def default_session_id(message: Dict[str, Any]) -> str:
+    return f"discord-{message['channel_id']}"
+
+
+def default_event(message: Dict[str, Any]) -> Optional[str]:
+    """Describe a message as a GAME event; None for messages without text"""
+    content = message.get("content")
+    if not content:
+        return None
+    author = message.get("author") or {}
+    name = author.get("global_name") or author.get("username") or "unknown"
+    return f"Message from user {name}: {content}"
+
+
+class DiscordGatewayConsumer:
+    """
+    Feeds incoming Discord messages to `Agent.areact`.
+
+    Connects to the Discord gateway over a websocket, keeps it alive with
+    heartbeats, and resumes the session after a reconnect so no events are
+    missed. Only the events of the requested `intents` are sent by Discord.
+    MESSAGE_CREATE events go to a bounded queue drained by a pool of worker
+    tasks; messages of one channel always go to the same worker, so they
+    are reacted to in order. The gateway cannot be slowed down, so when the
+    queue is full new messages are dropped (and counted in `dropped`).
+
+    Requires the `discord` extra (`pip install virtuals_sdk[discord]`) and,
+    for `areact`, the `async` extra.
+
+    Example:
+        consumer = DiscordGatewayConsumer(agent, bot_token)
+        asyncio.run(consumer.run())
+    """
+
+    def __init__(
+        self,
+        agent: "Agent",
+        bot_token: str,
+        intents: int = DEFAULT_INTENTS,
+        task: Optional[str] = "Reply to the message if it is appropriate",
+        workers: int = 8,
+        queue_size: int = 1000,
+        gateway_url: str = GATEWAY_URL,
+        ignore_bots: bool = True,
+        session_id: Callable[[Dict[str, Any]], str] = default_session_id,
+        event: Callable[[Dict[str, Any]], Optional[str]] = default_event,
+        history: Optional[HistoryStore] = None,
+        on_result: Optional[Callable[[str, Dict[str, Any], Any], Any]] = None,
+        on_error: Optional[Callable[[str, Dict[str, Any], BaseException], Any]] = None
+    ):
+        """
+        Args:
+            agent (Agent): Agent reacting to the messages
+            bot_token (str): Your Discord bot token
+            intents (int): Gateway intents, see the constants in this module
+            task (str): Task passed to `areact` with every event
+            workers (int): Number of worker tasks calling `areact`
+            queue_size (int): Maximum number of messages waiting for a worker
+            gateway_url (str): Gateway to connect to, e.g. a local stand-in for tests
+            ignore_bots (bool): Skip messages written by bots, including this one
+            session_id: Maps a message (dict) to the GAME session id
+            event: Maps a message (dict) to the GAME event, or None to skip it
+            history (HistoryStore): Adds the chat's earlier messages to the task when given
+            on_result: Called (or awaited) with the session id, the message and the GAME response
+            on_error: Called (or awaited) with the session id, the message and the exception
+        """
+        try:
+            import websockets  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                "DiscordGatewayConsumer requires websockets. Install it with: pip install virtuals_sdk[discord]"
+            )
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.agent = agent
+        self.bot_token = bot_token
+        self.intents = intents
+        self.task = task
+        self.workers = workers
+        self.queue_size = queue_size
+        self.gateway_url = gateway_url
+        self.ignore_bots = ignore_bots
+        self.session_id = session_id
+        self.event = event
+        self.history = history
+        self.on_result = on_result
+        self.on_error = on_error
+
+        # gateway session, kept across reconnects for resuming
+        self.gateway_session_id: Optional[str] = None
+        self.resume_gateway_url: Optional[str] = None
+        self.sequence: Optional[int] = None
+        self.user_id: Optional[str] = None
+
+        self.processed = 0
+        self.errors = 0
+        self.dropped = 0
+        self.reconnects = 0
+
+        self._queues: List[asyncio.Queue] = []
+        self._stopping: Optional[asyncio.Event] = None
+        self._websocket = None
+        # whether the current connection got a session (READY or RESUMED)
+        self._established = False
+
+    @staticmethod
+    def _url(base: str) -> str:
+        if "?" in base:
+            return f"{base}&v={GATEWAY_VERSION}&encoding=json"
+        return f"{base.rstrip('/')}/?v={GATEWAY_VERSION}&encoding=json"
+
+    async def run(self, max_backoff: float = 60.0):
+        """Consume events until `stop` is called; raises GatewayError on fatal close codes"""
+        import websockets
+
+        self._stopping = asyncio.Event()
+        self._queues = [asyncio.Queue(maxsize=max(1, self.queue_size // self.workers)) for _ in range(self.workers)]
+        workers = [asyncio.ensure_future(self._work(queue)) for queue in self._queues]
+        backoff = 1.0
+        try:
+            while not self._stopping.is_set():
+                resuming = self.gateway_session_id is not None and self.resume_gateway_url is not None
+                url = self._url(self.resume_gateway_url if resuming else self.gateway_url)
+                self._established = False
+                error: Optional[BaseException] = None
+                try:
+                    async with websockets.connect(url, max_size=None) as websocket:
+                        self._websocket = websocket
+                        await self._serve(websocket, resuming)
+                except (_Reconnect, websockets.exceptions.ConnectionClosed, websockets.exceptions.InvalidHandshake,
+                        OSError, asyncio.TimeoutError) as e:
+                    # only the close codes in FATAL_CLOSE_CODES end the loop; a
+                    # rejected handshake (e.g. a 502 from Discord's edge) is retried
+                    self._check_close(e)
+                    error = e
+                finally:
+                    self._websocket = None
+                # a clean close (error is None) is a reconnect like any other
+                if self._stopping.is_set():
+                    break
+                self.reconnects += 1
+                if self._established:
+                    backoff = 1.0
+                # reconnect immediately when asked to, back off otherwise, so a
+                # gateway that keeps closing the connection is not hammered
+                if not isinstance(error, _Reconnect):
+                    await self._sleep(random.uniform(0, backoff))
+                    backoff = min(max_backoff, backoff * 2)
+        finally:
+            for queue in self._queues:
+                await queue.put(None)
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._stopping = None
+
+    def stop(self):
+        """
+        Close the connection and make `run` return once the queued messages
+        are processed. Call from the event loop `run` is running on.
+        """
+        if self._stopping is None:
+            return
+        self._stopping.set()
+        if self._websocket is not None:
+            asyncio.ensure_future(self._websocket.close())
+
+    async def _sleep(self, delay: float):
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    def _check_close(self, error: BaseException):
+        received = getattr(error, "rcvd", None)
+        code = received.code if received is not None else None
+        if code in FATAL_CLOSE_CODES:
+            raise GatewayError(f"Discord gateway closed the connection: {code} {received.reason}", code)
+        if code in NEW_SESSION_CLOSE_CODES:
+            self._reset_session()
+
+    def _reset_session(self):
+        self.gateway_session_id = None
+        self.resume_gateway_url = None
+        self.sequence = None
+
+    async def _serve(self, websocket, resuming: bool):
+        hello = codec.loads(await websocket.recv())
+        if hello["op"] != HELLO:
+            raise _Reconnect()
+        acked = asyncio.Event()
+        acked.set()
+        heartbeat = asyncio.ensure_future(self._heartbeat(websocket, hello["d"]["heartbeat_interval"] / 1000, acked))
+        try:
+            if resuming:
+                await self._send(websocket, RESUME, {
+                    "token": self.bot_token,
+                    "session_id": self.gateway_session_id,
+                    "seq": self.sequence,
+                })
+            else:
+                await self._identify(websocket)
+
+            async for raw in websocket:
+                if heartbeat.done():
+                    # the heartbeat task ended: the connection is a zombie
+                    heartbeat.result()
+                payload = codec.loads(raw)
+                op = payload["op"]
+                if op == DISPATCH:
+                    self.sequence = payload["s"]
+                    self._dispatch(payload["t"], payload["d"])
+                elif op == HEARTBEAT:
+                    await self._send(websocket, HEARTBEAT, self.sequence)
+                elif op == HEARTBEAT_ACK:
+                    acked.set()
+                elif op == RECONNECT:
+                    raise _Reconnect()
+                elif op == INVALID_SESSION:
+                    if not payload["d"]:
+                        self._reset_session()
+                    # Discord asks for a random 1-5s wait before identifying again
+                    await self._sleep(random.uniform(1, 5))
+                    raise _Reconnect()
+        finally:
+            heartbeat.cancel()
+
+    async def _identify(self, websocket):
+        await self._send(websocket, IDENTIFY, {
+            "token": self.bot_token,
+            "intents": self.intents,
+            "properties": {"os": "linux", "browser": "virtuals_sdk", "device": "virtuals_sdk"},
+        })
+
+    async def _heartbeat(self, websocket, interval: float, acked: asyncio.Event):
+        # the first heartbeat is jittered so reconnecting clients spread out
+        await asyncio.sleep(interval * random.random())
+        while True:
+            if not acked.is_set():
+                # no ACK since the last heartbeat: drop the connection and resume
+                await websocket.close(4000, "heartbeat not acknowledged")
+                raise _Reconnect()
+            acked.clear()
+            await self._send(websocket, HEARTBEAT, self.sequence)
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    async def _send(websocket, op: int, data: Any):
+        await websocket.send(codec.dumps_str({"op": op, "d": data}))
+
+    def _dispatch(self, event_type: str, data: Dict[str, Any]):
+        if event_type in ("READY", "RESUMED"):
+            self._established = True
+        if event_type == "READY":
+            self.gateway_session_id = data["session_id"]
+            self.resume_gateway_url = data.get("resume_gateway_url")
+            self.user_id = data.get("user", {}).get("id")
+        elif event_type == "MESSAGE_CREATE":
+            author = data.get("author") or {}
+            if self.ignore_bots and (author.get("bot") or author.get("id") == self.user_id):
+                return
+            queue = self._queues[hash(data["channel_id"]) % self.workers]
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    async def _work(self, queue: asyncio.Queue):
+        while True:
+            message = await queue.get()
+            if message is None:
+                return
+            await self._process(message)
+
+    async def _process(self, message: Dict[str, Any]):
+        session_id = self.session_id(message)
+        try:
+            event = self.event(message)
+            if event is None:
+                return
+            task = self.task
+            if self.history is not None:
+                task = self.history.render_task(session_id, task)
+                self.history.append(session_id, event)
+            response = await self.agent.areact(session_id=session_id, platform="discord", event=event, task=task,
+                                               delivery_id=message.get("id"))
+            self.processed += 1
+            await self._notify(self.on_result, session_id, message, response)
+        except Exception as e:
+            self.errors += 1
+            if self.on_error is None:
+                print(f"Error reacting to Discord message {message.get('id')} in session {session_id}: {e}")
+            await self._notify(self.on_error, session_id, message, e)
+
+    @staticmethod
+    async def _notify(callback, session_id: str, message: Dict[str, Any], value):
+        if callback is None:
+            return
+        try:
+            result = callback(session_id, message, value)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"Error in gateway callback for session {session_id}: {e}")
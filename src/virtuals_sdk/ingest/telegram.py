@@ -0,0 +1,299 @@
+import heapq
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+import requests
+from virtuals_sdk import codec
+from virtuals_sdk.history import HistoryStore
+from virtuals_sdk.ratelimit import _retry_after
+from virtuals_sdk.state import StateStore
+from virtuals_sdk.transport import HTTPTransport, default_transport
+
+if TYPE_CHECKING:
+    from virtuals_sdk.game import Agent
+
+# update types carrying a message, in the order they are looked up
+MESSAGE_UPDATE_TYPES = ("message", "edited_message", "channel_post", "edited_channel_post")
+
+
+def update_message(update: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The message carried by a Telegram update, if any"""
+    for update_type in MESSAGE_UPDATE_TYPES:
+        message = update.get(update_type)
+        if message is not None:
+            return message
+    return None
+
+
+def default_session_id(chat: Dict[str, Any]) -> str:
+    return f"telegram-{chat['id']}"
+
+
+def default_event(message: Dict[str, Any]) -> Optional[str]:
+    """Describe a message as a GAME event; None for messages without text"""
+    text = message.get("text") or message.get("caption")
+    if not text:
+        return None
+    sender = message.get("from") or {}
+    name = sender.get("username") or sender.get("first_name") or "unknown"
+    chat = message["chat"]
+    if chat.get("type") == "private":
+        return f"Message from user {name}: {text}"
+    return f"Message from user {name} in {chat.get('title') or 'the group'}: {text}"
+
+
+class _Shutdown:
+    pass
+
+
+_SHUTDOWN = _Shutdown()
+
+
+class TelegramUpdateIngestor:
+    """
+    Feeds incoming Telegram messages to `Agent.react`.
+
+    Updates are fetched in batches with `getUpdates` long polling and
+    dispatched to a pool of worker threads. Messages of one chat always go
+    to the same worker, so a chat's messages are reacted to in order while
+    different chats are processed in parallel. The worker queues are
+    bounded: when the agent falls behind, polling waits instead of
+    buffering without limit.
+
+    The offset is only advanced past updates that have been processed
+    (the highest contiguous one), and is saved to `state_store` when
+    given, so a restart resumes where processing stopped rather than where
+    fetching stopped. Updates in flight during a crash are delivered again.
+
+    Example:
+        ingestor = TelegramUpdateIngestor(agent, bot_token, state_store=JournalStateStore("telegram.json"))
+        ingestor.run()
+    """
+
+    def __init__(
+        self,
+        agent: "Agent",
+        bot_token: str,
+        task: Optional[str] = "Reply to the message if it is appropriate",
+        workers: int = 8,
+        queue_size: int = 1000,
+        batch_size: int = 100,
+        poll_timeout: int = 30,
+        allowed_updates: Optional[List[str]] = None,
+        state_store: Optional[StateStore] = None,
+        transport: Optional[HTTPTransport] = None,
+        session_id: Callable[[Dict[str, Any]], str] = default_session_id,
+        event: Callable[[Dict[str, Any]], Optional[str]] = default_event,
+        history: Optional[HistoryStore] = None,
+        on_result: Optional[Callable[[str, Dict[str, Any], Any], Any]] = None,
+        on_error: Optional[Callable[[str, Dict[str, Any], BaseException], Any]] = None
+    ):
+        """
+        Args:
+            agent (Agent): Agent reacting to the messages
+            bot_token (str): Your Telegram bot token
+            task (str): Task passed to `react` with every event
+            workers (int): Number of worker threads calling `react`
+            queue_size (int): Maximum number of updates queued or in flight
+            batch_size (int): Maximum number of updates per `getUpdates` call (1-100)
+            poll_timeout (int): Long polling timeout in seconds
+            allowed_updates (list): Update types to receive; defaults to the message types
+            state_store (StateStore): Where the offset is saved; in memory only if None
+            transport (HTTPTransport): Connection pool for the Bot API calls
+            session_id: Maps a chat (dict) to the GAME session id
+            event: Maps a message (dict) to the GAME event, or None to skip it
+            history (HistoryStore): Adds the chat's earlier messages to the task when given
+            on_result: Called with the session id, the update and the GAME response
+            on_error: Called with the session id, the update and the exception
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.agent = agent
+        self.bot_token = bot_token
+        self.task = task
+        self.workers = workers
+        self.batch_size = max(1, min(100, batch_size))
+        self.poll_timeout = poll_timeout
+        self.allowed_updates = list(allowed_updates or MESSAGE_UPDATE_TYPES)
+        self.state_store = state_store
+        self.transport = transport or default_transport()
+        self.session_id = session_id
+        self.event = event
+        self.history = history
+        self.on_result = on_result
+        self.on_error = on_error
+
+        # the bot id is the part of the token before the colon
+        self.state_key = f"telegram-ingest-{bot_token.split(':', 1)[0]}"
+        self._lock = threading.Lock()
+        self._progress = threading.Condition(self._lock)
+        self._queues = [queue.Queue(maxsize=max(1, queue_size // workers)) for _ in range(workers)]
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+
+        # update ids dispatched but not processed yet, and the processed ones
+        # among them that cannot be committed until the smaller ones are
+        self._pending: List[int] = []
+        self._processed: set = set()
+        stored = state_store.get(self.state_key).get("offset") if state_store else None
+        self.offset: int = stored or 0
+        self._last_seen = self.offset - 1
+
+        self.processed = 0
+        self.errors = 0
+
+    def api_url(self, method: str) -> str:
+        return f"https://api.telegram.org/bot{self.bot_token}/{method}"
+
+    def fetch_updates(self) -> List[Dict[str, Any]]:
+        """Long-poll for the updates after the committed offset"""
+        payload = {
+            "offset": self.offset,
+            "limit": self.batch_size,
+            "timeout": self.poll_timeout,
+            "allowed_updates": self.allowed_updates,
+        }
+        response = self.transport.request(
+            "POST", self.api_url("getUpdates"), content=codec.dumps(payload),
+            headers={"Content-Type": "application/json"}, timeout=self.poll_timeout + 10)
+        try:
+            body = codec.loads(response.content)
+        except ValueError:
+            # proxies and load balancers answer errors with HTML pages
+            body = None
+        if not 200 <= response.status_code < 300 or not isinstance(body, dict) or not body.get("ok"):
+            description = body.get("description") if isinstance(body, dict) else None
+            raise requests.exceptions.HTTPError(
+                f"getUpdates failed: {response.status_code} {description or response.reason}", response=response)
+        return body["result"]
+
+    def dispatch(self, update: Dict[str, Any]) -> bool:
+        """
+        Queue one update for processing, blocking while its worker's queue
+        is full. Returns False for updates that were already dispatched.
+        """
+        update_id = update["update_id"]
+        with self._lock:
+            if update_id <= self._last_seen:
+                return False
+            self._last_seen = update_id
+            heapq.heappush(self._pending, update_id)
+
+        message = update_message(update)
+        if message is None or "chat" not in message:
+            self._done(update_id)
+            return True
+        shard = hash(message["chat"]["id"]) % self.workers
+        self._queues[shard].put((update, message))
+        return True
+
+    def _done(self, update_id: int):
+        with self._lock:
+            self._processed.add(update_id)
+            while self._pending and self._pending[0] in self._processed:
+                self._processed.discard(heapq.heappop(self._pending))
+            offset = self._pending[0] if self._pending else self._last_seen + 1
+            advanced = offset > self.offset
+            if advanced:
+                self.offset = offset
+                self._progress.notify_all()
+        if advanced and self.state_store is not None:
+            self.state_store.update(self.state_key, {"offset": offset})
+
+    def _work(self, shard: "queue.Queue"):
+        while True:
+            item = shard.get()
+            if item is _SHUTDOWN:
+                return
+            update, message = item
+            try:
+                self._process(update, message)
+            finally:
+                self._done(update["update_id"])
+
+    def _process(self, update: Dict[str, Any], message: Dict[str, Any]):
+        session_id = self.session_id(message["chat"])
+        try:
+            event = self.event(message)
+            if event is None:
+                return
+            task = self.task
+            if self.history is not None:
+                task = self.history.render_task(session_id, task)
+                self.history.append(session_id, event)
+            response = self.agent.react(session_id=session_id, platform="telegram", event=event, task=task,
+                                        delivery_id=str(update["update_id"]))
+            self.processed += 1
+            self._notify(self.on_result, session_id, update, response)
+        except Exception as e:
+            self.errors += 1
+            if self.on_error is None:
+                print(f"Error reacting to Telegram update {update['update_id']} in session {session_id}: {e}")
+            self._notify(self.on_error, session_id, update, e)
+
+    @staticmethod
+    def _notify(callback, session_id: str, update: Dict[str, Any], value):
+        # a failing callback must not kill the worker, whose chats would stall
+        if callback is None:
+            return
+        try:
+            callback(session_id, update, value)
+        except Exception as e:
+            print(f"Error in update callback for session {session_id}: {e}")
+
+    def start(self):
+        """Start the worker threads"""
+        if self._threads:
+            return
+        self._stopping.clear()
+        for index, shard in enumerate(self._queues):
+            thread = threading.Thread(target=self._work, args=(shard,), name=f"telegram-ingest-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def poll_once(self) -> int:
+        """Fetch one batch and dispatch it; returns the number of new updates"""
+        updates = self.fetch_updates()
+        dispatched = sum(self.dispatch(update) for update in updates)
+        if updates and not dispatched:
+            # every update returned is still in flight: wait for some to be
+            # processed rather than re-fetching the same batch in a busy loop
+            with self._progress:
+                offset = self.offset
+                self._progress.wait_for(lambda: self.offset != offset or self._stopping.is_set(), timeout=self.poll_timeout)
+        return dispatched
+
+    def run(self, retry_delay: float = 5.0, max_backoff: float = 60.0):
+        """
+        Poll and process updates until `stop` is called. Failed polls are
+        retried after `retry_delay` seconds, doubling up to `max_backoff`
+        while they keep failing, or after the `retry_after` of a 429.
+        """
+        self.start()
+        try:
+            delay = retry_delay
+            while not self._stopping.is_set():
+                try:
+                    self.poll_once()
+                    delay = retry_delay
+                except requests.exceptions.RequestException as e:
+                    print(f"Error polling Telegram updates: {e}")
+                    response = e.response
+                    wait = _retry_after(response) if response is not None and response.status_code == 429 else None
+                    self._stopping.wait(wait if wait is not None else delay)
+                    delay = min(max_backoff, delay * 2)
+        finally:
+            self._shutdown_workers()
+
+    def stop(self):
+        """Make `run` return once the current poll ends and the queued updates are processed"""
+        self._stopping.set()
+        with self._progress:
+            self._progress.notify_all()
+
+    def _shutdown_workers(self):
+        for shard in self._queues:
+            shard.put(_SHUTDOWN)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
@@ -0,0 +1,209 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Optional, Protocol, Sequence, Tuple
+
+
+class MetricsHook(Protocol):
+    """Anything that can receive one observation per HTTP exchange"""
+
+    def observe_request(self, kind: str, name: str, duration: float, status: Optional[int],
+                        request_bytes: int, response_bytes: int, error: Optional[str] = None):
+        ...
+
+
+class CompressionMetricsHook(MetricsHook, Protocol):
+    """A MetricsHook that also wants the size of compressed request bodies before compression"""
+
+    def observe_compression(self, kind: str, name: str, raw_bytes: int, wire_bytes: int):
+        ...
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """
+    In-memory metrics for GAME API calls (`kind="game_api"`, named by
+    endpoint) and custom Function executions (`kind="function"`, named by
+    fn_name): latency and size histograms, request counts by status code
+    and error counts. Export with `to_prometheus()`.
+
+    Example:
+        registry = MetricsRegistry()
+        set_metrics_hook(registry)
+        ...
+        print(registry.to_prometheus())
+    """
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+    def __init__(self, latency_buckets: Sequence[float] = LATENCY_BUCKETS, size_buckets: Sequence[float] = SIZE_BUCKETS):
+        self.latency_buckets = latency_buckets
+        self.size_buckets = size_buckets
+        self._lock = threading.Lock()
+        self._latency: Dict[Labels, Histogram] = {}
+        self._request_size: Dict[Labels, Histogram] = {}
+        self._response_size: Dict[Labels, Histogram] = {}
+        self._requests: Dict[Labels, int] = {}
+        self._errors: Dict[Labels, int] = {}
+        self._raw_request_size: Dict[Labels, Histogram] = {}
+        self._compressed_request_size: Dict[Labels, Histogram] = {}
+
+    def observe_request(self, kind: str, name: str, duration: float, status: Optional[int],
+                        request_bytes: int, response_bytes: int, error: Optional[str] = None):
+        labels = (("kind", kind), ("name", name))
+        status_labels = labels + (("status", str(status) if status is not None else "none"),)
+        with self._lock:
+            self._histogram(self._latency, labels, self.latency_buckets).observe(duration)
+            self._histogram(self._request_size, labels, self.size_buckets).observe(request_bytes)
+            self._histogram(self._response_size, labels, self.size_buckets).observe(response_bytes)
+            self._requests[status_labels] = self._requests.get(status_labels, 0) + 1
+            if error is not None or (status is not None and status >= 400):
+                error_labels = labels + (("error", error or str(status)),)
+                self._errors[error_labels] = self._errors.get(error_labels, 0) + 1
+
+    def observe_compression(self, kind: str, name: str, raw_bytes: int, wire_bytes: int):
+        labels = (("kind", kind), ("name", name))
+        with self._lock:
+            self._histogram(self._raw_request_size, labels, self.size_buckets).observe(raw_bytes)
+            self._histogram(self._compressed_request_size, labels, self.size_buckets).observe(wire_bytes)
+
+    @staticmethod
+    def _histogram(histograms: Dict[Labels, Histogram], labels: Labels, bounds: Sequence[float]) -> Histogram:
+        histogram = histograms.get(labels)
+        if histogram is None:
+            histogram = histograms[labels] = Histogram(bounds)
+        return histogram
+
+    def reset(self):
+        with self._lock:
+            for series in (self._latency, self._request_size, self._response_size, self._requests, self._errors,
+                           self._raw_request_size, self._compressed_request_size):
+                series.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-dict view of every series, e.g. for logging or tests"""
+        def histograms(series):
+            return {
+                "{kind}:{name}".format(**dict(labels)): {"count": h.count, "sum": h.sum}
+                for labels, h in series.items()
+            }
+
+        with self._lock:
+            return {
+                "latency_seconds": histograms(self._latency),
+                "request_bytes": histograms(self._request_size),
+                "response_bytes": histograms(self._response_size),
+                "compressed_request_raw_bytes": histograms(self._raw_request_size),
+                "compressed_request_wire_bytes": histograms(self._compressed_request_size),
+                "requests": {labels: count for labels, count in self._requests.items()},
+                "errors": {labels: count for labels, count in self._errors.items()},
+            }
+
+    def to_prometheus(self) -> str:
+        """Render every series in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            self._render_histograms(lines, "virtuals_request_duration_seconds",
+                                    "Latency of GAME API calls and Function executions", self._latency)
+            self._render_histograms(lines, "virtuals_request_size_bytes", "Request body size on the wire", self._request_size)
+            self._render_histograms(lines, "virtuals_compressed_request_raw_bytes",
+                                    "Size of compressed request bodies before compression", self._raw_request_size)
+            self._render_histograms(lines, "virtuals_compressed_request_wire_bytes",
+                                    "Size of compressed request bodies after compression", self._compressed_request_size)
+            self._render_histograms(lines, "virtuals_response_size_bytes", "Response body size", self._response_size)
+            self._render_counters(lines, "virtuals_requests_total", "Requests by status code", self._requests)
+            self._render_counters(lines, "virtuals_request_errors_total",
+                                  "Failed requests by error or status code", self._errors)
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(lines, metric: str, help_text: str, series: Dict[Labels, Histogram]):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for labels, histogram in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                lines.append(f"{metric}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+            lines.append(f"{metric}_bucket{_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+            lines.append(f"{metric}_sum{_labels(labels)} {_number(histogram.sum)}")
+            lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+
+    @staticmethod
+    def _render_counters(lines, metric: str, help_text: str, series: Dict[Labels, int]):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for labels, count in sorted(series.items()):
+            lines.append(f"{metric}{_labels(labels)} {count}")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _labels(labels: Labels) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels) + "}"
+
+
+_hook: Optional[MetricsHook] = None
+
+
+def set_metrics_hook(hook: Optional[MetricsHook]):
+    """
+    Install the process-wide metrics hook used by every GameSDK and
+    Function that was not given one. Pass None to disable metrics.
+    """
+    global _hook
+    _hook = hook
+
+
+def get_metrics_hook() -> Optional[MetricsHook]:
+    return _hook
+
+
+def _body_size(body: Any) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    return 0
+
+
+def record(hook: MetricsHook, kind: str, name: str, started: float, request_kwargs: Dict[str, Any],
+           response=None, error: Optional[BaseException] = None, raw_bytes: Optional[int] = None):
+    """
+    Report one HTTP exchange that began at `started` (a `time.perf_counter()`
+    value). `raw_bytes` is the body size before compression, if it was compressed.
+    """
+    duration = time.perf_counter() - started
+    request_bytes = _body_size(request_kwargs.get("content", request_kwargs.get("data")))
+    if raw_bytes is not None:
+        observe_compression = getattr(hook, "observe_compression", None)
+        if observe_compression is not None:
+            observe_compression(kind, name, raw_bytes, request_bytes)
+    if response is None:
+        hook.observe_request(kind, name, duration, None, request_bytes, 0, type(error).__name__ if error else None)
+    else:
+        hook.observe_request(kind, name, duration, response.status_code, request_bytes, len(response.content))
@@ -0,0 +1,237 @@
+import threading
+import time
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from virtuals_sdk.game import Function
+
+
+class TokenBucket:
+    """
+    A token bucket refilled at `rate` tokens per `per` seconds.
+
+    Taking a token never fails: when the bucket is empty the caller gets
+    back how long to wait for its turn, so requests queue up in order
+    instead of being rejected. Not thread-safe on its own; RateLimiter
+    guards its buckets with a lock.
+    """
+    __slots__ = ("rate", "capacity", "tokens", "updated_at", "blocked_until")
+
+    def __init__(self, rate: float, per: float = 1.0, capacity: Optional[float] = None):
+        self.rate = rate / per
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, now: float) -> float:
+        """Take a token and return the seconds to wait before using it"""
+        self._refill(now)
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+    def block(self, until: float):
+        """Hold back every request until `until` (e.g. after a 429)"""
+        self.blocked_until = max(self.blocked_until, until)
+
+    def is_idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and self.blocked_until <= now
+
+    def state(self, now: float) -> Dict[str, float]:
+        self._refill(now)
+        return {
+            "tokens": self.tokens,
+            "capacity": self.capacity,
+            "retry_after": max(0.0, self.blocked_until - now),
+        }
+
+
+class RateLimiter:
+    """
+    Base rate limiter for Function execution; it never delays anything.
+
+    `Function.__call__`/`acall` ask `acquire` how long to wait before
+    sending, and pass every response to `observe`, which returns a delay
+    when the request was throttled and should be sent again (up to
+    `max_retries` times) instead of failing.
+    """
+    max_retries: int = 5
+
+    def __init__(self, max_idle_keys: int = 10000):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.max_idle_keys = max_idle_keys
+
+    def acquire(self, fn: "Function", arg_dict: Dict[str, Any]) -> float:
+        """Reserve a slot for a call and return the seconds to wait"""
+        return 0.0
+
+    def observe(self, fn: "Function", arg_dict: Dict[str, Any], response) -> Optional[float]:
+        """Record a response; return seconds to wait before retrying it, or None"""
+        return None
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Current state of every bucket, for monitoring"""
+        now = time.monotonic()
+        with self._lock:
+            return {key: bucket.state(now) for key, bucket in self._buckets.items()}
+
+    def _bucket(self, key: str, rate: float, per: float = 1.0, capacity: Optional[float] = None) -> TokenBucket:
+        """Get or create a bucket; caller must hold the lock"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_idle_keys:
+                self._prune()
+            bucket = self._buckets[key] = TokenBucket(rate, per, capacity)
+        return bucket
+
+    def _prune(self):
+        now = time.monotonic()
+        for key in [key for key, bucket in self._buckets.items() if bucket.is_idle(now)]:
+            del self._buckets[key]
+
+
+def _retry_after(response) -> Optional[float]:
+    """Seconds to wait from a 429 response body or Retry-After header"""
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    if isinstance(body, dict):
+        # Telegram: {"parameters": {"retry_after": 5}}, Discord: {"retry_after": 1.5}
+        retry_after = (body.get("parameters") or {}).get("retry_after", body.get("retry_after"))
+        if retry_after is not None:
+            return float(retry_after)
+    header = response.headers.get("Retry-After")
+    try:
+        return float(header) if header is not None else None
+    except ValueError:
+        return None
+
+
+class TelegramRateLimiter(RateLimiter):
+    """
+    Telegram Bot API limits for one bot token: about 30 messages per
+    second overall, 1 per second in a private chat and 20 per minute in a
+    group (negative chat ids). 429 responses are retried after the
+    `retry_after` the API asks for.
+    """
+
+    def __init__(self, global_rate: float = 30, chat_rate: float = 1, group_rate: float = 20,
+                 group_per: float = 60, max_idle_keys: int = 10000):
+        super().__init__(max_idle_keys)
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.group_per = group_per
+
+    def _chat_bucket(self, arg_dict: Dict[str, Any]) -> Optional[TokenBucket]:
+        chat_id = arg_dict.get("chat_id")
+        if chat_id is None:
+            return None
+        chat_id = str(chat_id)
+        if chat_id.startswith("-"):
+            return self._bucket(f"chat:{chat_id}", self.group_rate, self.group_per)
+        return self._bucket(f"chat:{chat_id}", self.chat_rate)
+
+    def acquire(self, fn: "Function", arg_dict: Dict[str, Any]) -> float:
+        now = time.monotonic()
+        with self._lock:
+            wait = self._bucket("global", self.global_rate).reserve(now)
+            chat = self._chat_bucket(arg_dict)
+            if chat is not None:
+                wait = max(wait, chat.reserve(now))
+            return wait
+
+    def observe(self, fn: "Function", arg_dict: Dict[str, Any], response) -> Optional[float]:
+        if response.status_code != 429:
+            return None
+        retry_after = _retry_after(response) or 1.0
+        with self._lock:
+            bucket = self._chat_bucket(arg_dict) or self._bucket("global", self.global_rate)
+            bucket.block(time.monotonic() + retry_after)
+        return retry_after
+
+
+# path parameters that get their own bucket on the same Discord route
+_DISCORD_MAJOR_PARAMETERS = ("channel_id", "guild_id", "webhook_id")
+
+
+class DiscordRateLimiter(RateLimiter):
+    """
+    Discord limits for one bot token: a global limit of 50 requests per
+    second plus per-route buckets, keyed by method, route and major
+    parameter (channel/guild/webhook id). Bucket sizes are learned from
+    the `X-RateLimit-*` response headers; 429 responses are retried after
+    the `retry_after` Discord asks for.
+    """
+
+    def __init__(self, global_rate: float = 50, max_idle_keys: int = 10000):
+        super().__init__(max_idle_keys)
+        self.global_rate = global_rate
+        # route key -> bucket hash reported by Discord
+        self._route_buckets: Dict[str, str] = {}
+
+    @staticmethod
+    def route_key(fn: "Function", arg_dict: Dict[str, Any]) -> str:
+        route = fn.config.url
+        for name in _DISCORD_MAJOR_PARAMETERS:
+            if name in arg_dict:
+                route = route.replace("{{" + name + "}}", str(arg_dict[name]))
+        return f"{fn.config.method.upper()} {route}"
+
+    def _route_bucket(self, route: str) -> TokenBucket:
+        name = self._route_buckets.get(route, route)
+        # unknown until Discord tells us; start with one in-flight request at a time
+        return self._bucket(f"route:{name}", 1, capacity=1)
+
+    def acquire(self, fn: "Function", arg_dict: Dict[str, Any]) -> float:
+        now = time.monotonic()
+        route = self.route_key(fn, arg_dict)
+        with self._lock:
+            wait = self._bucket("global", self.global_rate).reserve(now)
+            return max(wait, self._route_bucket(route).reserve(now))
+
+    def observe(self, fn: "Function", arg_dict: Dict[str, Any], response) -> Optional[float]:
+        headers = response.headers
+        now = time.monotonic()
+        route = self.route_key(fn, arg_dict)
+
+        with self._lock:
+            bucket_hash = headers.get("X-RateLimit-Bucket")
+            if bucket_hash:
+                major = route.split(" ", 1)[1]
+                for name in _DISCORD_MAJOR_PARAMETERS:
+                    if name in arg_dict:
+                        major = str(arg_dict[name])
+                        break
+                self._route_buckets[route] = f"{bucket_hash}:{major}"
+
+            bucket = self._route_bucket(route)
+            limit = headers.get("X-RateLimit-Limit")
+            remaining = headers.get("X-RateLimit-Remaining")
+            reset_after = headers.get("X-RateLimit-Reset-After")
+            if limit and reset_after:
+                bucket.capacity = float(limit)
+                bucket.rate = float(limit) / max(float(reset_after), 0.001)
+            if remaining is not None:
+                bucket.tokens = min(bucket.tokens, float(remaining))
+                bucket.updated_at = now
+                if float(remaining) <= 0 and reset_after:
+                    bucket.block(now + float(reset_after))
+
+            if response.status_code != 429:
+                return None
+
+            retry_after = _retry_after(response) or 1.0
+            is_global = headers.get("X-RateLimit-Global") or (
+                headers.get("X-RateLimit-Scope") == "global")
+            target = self._bucket("global", self.global_rate) if is_global else bucket
+            target.block(now + retry_after)
+            return retry_after
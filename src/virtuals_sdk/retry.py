@@ -0,0 +1,185 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, FrozenSet, Optional
+import requests
+import urllib3
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class GameAPIError(Exception):
+    """A GAME API call failed; `status_code` and the error `body` are kept"""
+
+    def __init__(self, body: Any, status_code: Optional[int] = None):
+        super().__init__(body)
+        self.body = body
+        self.status_code = status_code
+
+
+class CircuitOpenError(GameAPIError):
+    """The GAME API is considered down; the call was not attempted"""
+
+
+def is_transport_error(error: BaseException) -> bool:
+    """Whether an exception is a network-level failure of `requests` or `httpx`"""
+    if isinstance(error, requests.exceptions.RequestException):
+        return True
+    return httpx is not None and isinstance(error, httpx.TransportError)
+
+
+def is_connect_error(error: BaseException) -> bool:
+    """Whether a network failure happened before the request could be sent"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError):
+        # requests also reports connections dropped after the request was
+        # sent ("Connection aborted") as ConnectionError: only count those
+        # where no connection could be opened
+        reason = error.args[0] if error.args else None
+        reason = getattr(reason, "reason", reason)
+        return isinstance(reason, (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ConnectTimeoutError))
+    return httpx is not None and isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
+def retry_after(response) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    When and how long to wait before re-sending a failed request.
+
+    Delays grow exponentially from `backoff` up to `max_backoff`, with
+    "full jitter" (a random delay between 0 and the backoff) so that many
+    clients recovering at once do not retry in lockstep. A Retry-After
+    header from the server takes precedence.
+    """
+    max_attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    jitter: bool = True
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    # errors before the request was sent are always safe to retry; errors
+    # after (e.g. read timeouts) only for idempotent endpoints
+    retry_connect_errors: bool = True
+    retry_read_errors: bool = False
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff * (2 ** (attempt - 1)))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def response_delay(self, attempt: int, response) -> Optional[float]:
+        """Seconds to wait before retrying after `response`, or None to stop"""
+        if attempt >= self.max_attempts or response.status_code not in self.retry_statuses:
+            return None
+        server_delay = retry_after(response)
+        if server_delay is not None:
+            return min(server_delay, self.max_backoff)
+        return self._backoff(attempt)
+
+    def error_delay(self, attempt: int, error: BaseException) -> Optional[float]:
+        """Seconds to wait before retrying after a network error, or None to stop"""
+        if attempt >= self.max_attempts:
+            return None
+        if is_connect_error(error):
+            retry = self.retry_connect_errors
+        else:
+            retry = self.retry_read_errors
+        return self._backoff(attempt) if retry else None
+
+
+# `functions` only reads; simulate/react/deploy trigger work on the server,
+# so they are only retried when the server did not process the request:
+# throttled (429), unavailable (503) or never reached. A 502 or 504 may
+# come after the upstream handled the request, so these are not retried
+IDEMPOTENT = RetryPolicy(max_attempts=4, retry_read_errors=True)
+NON_IDEMPOTENT = RetryPolicy(max_attempts=3, retry_statuses=frozenset({429, 503}))
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+DEFAULT_RETRY_POLICIES = {
+    "functions": IDEMPOTENT,
+    "simulate": NON_IDEMPOTENT,
+    "react": NON_IDEMPOTENT,
+    "deploy": NON_IDEMPOTENT,
+}
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while the API looks down.
+
+    After `failure_threshold` consecutive failures (network errors and 5xx
+    responses) the circuit opens and calls raise CircuitOpenError without
+    touching the network. After `recovery_timeout` seconds a single probe
+    call is let through: success closes the circuit, failure re-opens it.
+    Thread-safe, and may be shared between clients.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._probing = False
+        self._probe_started = 0.0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not be attempted"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.OPEN:
+                remaining = self.recovery_timeout - (time.monotonic() - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(f"GAME API circuit is open, retry in {remaining:.1f}s")
+                self._state = self.HALF_OPEN
+            now = time.monotonic()
+            # a probe that never reported back does not block the circuit forever
+            if self._probing and now - self._probe_started < self.recovery_timeout:
+                raise CircuitOpenError("GAME API circuit is half-open, waiting for the probe call")
+            self._probing = True
+            self._probe_started = now
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
@@ -0,0 +1,221 @@
+import asyncio
+import heapq
+import inspect
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from virtuals_sdk.game import Agent
+
+# an event for the next run: a fixed string, or a (sync or async) callable
+# given the session id that fetches one, returning None when there is none
+EventSource = Union[str, Callable[[str], Union[Optional[str], Awaitable[Optional[str]]]], None]
+
+
+@dataclass
+class ScheduledSession:
+    """A session driven by SessionScheduler, with its run statistics"""
+    session_id: str
+    platform: str
+    interval: float
+    task: Optional[str] = None
+    event: EventSource = None
+    paused: bool = False
+    runs: int = 0
+    errors: int = 0
+    last_run: Optional[float] = None
+    last_result: Any = field(default=None, repr=False)
+    last_error: Optional[BaseException] = None
+    # bumped on every (re)schedule so stale heap entries are skipped
+    _generation: int = field(default=0, repr=False)
+
+
+class SessionScheduler:
+    """
+    Drives many agent sessions concurrently on one event loop.
+
+    Each session runs on its own timer: Twitter sessions call
+    `asimulate_twitter` every `main_heartbeat`, other platforms call
+    `areact` every `reaction_heartbeat` (heartbeats are in minutes, like
+    in the Agent Sandbox), unless an explicit interval is given. First
+    runs are spread over the interval and every later run is jittered, so
+    thousands of sessions do not hit the API at the same moment. At most
+    `max_concurrency` runs are in flight, and a session never overlaps
+    with itself.
+
+    Example:
+        scheduler = SessionScheduler(agent, max_concurrency=200)
+        for chat_id in chats:
+            scheduler.add_session(f"tg-{chat_id}", "telegram", task="Engage with the chat")
+        asyncio.run(scheduler.run())
+    """
+
+    def __init__(
+        self,
+        agent: "Agent",
+        max_concurrency: int = 100,
+        jitter: float = 0.1,
+        heartbeat_unit: float = 60.0,
+        on_result: Optional[Callable[[ScheduledSession, Any], Any]] = None,
+        on_error: Optional[Callable[[ScheduledSession, BaseException], Any]] = None
+    ):
+        """
+        Args:
+            agent (Agent): Agent whose configuration the sessions run with
+            max_concurrency (int): Maximum number of runs in flight
+            jitter (float): Random +/- fraction applied to every interval
+            heartbeat_unit (float): Seconds per heartbeat unit (minutes by default)
+            on_result: Called (or awaited) with the session and the GAME response
+            on_error: Called (or awaited) with the session and the exception
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.agent = agent
+        self.max_concurrency = max_concurrency
+        self.jitter = jitter
+        self.heartbeat_unit = heartbeat_unit
+        self.on_result = on_result
+        self.on_error = on_error
+
+        self.sessions: Dict[str, ScheduledSession] = {}
+        self._queue: List[Tuple[float, int, str, int]] = []
+        self._sequence = 0
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def add_session(self, session_id: str, platform: str, task: Optional[str] = None,
+                    event: EventSource = None, interval: Optional[float] = None) -> ScheduledSession:
+        """
+        Schedule a session. Its first run happens at a random point within
+        its interval; `interval` is in seconds and defaults to the agent's
+        heartbeat for the platform.
+        """
+        if interval is None:
+            heartbeat = self.agent.main_heartbeat if platform.lower() == "twitter" else self.agent.reaction_heartbeat
+            interval = heartbeat * self.heartbeat_unit
+
+        session = ScheduledSession(session_id, platform, interval, task=task, event=event)
+        self.sessions[session_id] = session
+        self._schedule(session, random.uniform(0, interval))
+        return session
+
+    def remove_session(self, session_id: str):
+        """Stop scheduling a session; a run in flight is left to finish"""
+        session = self.sessions.pop(session_id)
+        session._generation += 1
+
+    def pause(self, session_id: str):
+        """Skip a session's runs until it is resumed"""
+        session = self.sessions[session_id]
+        session.paused = True
+        session._generation += 1
+
+    def resume(self, session_id: str, delay: float = 0.0):
+        """Resume a paused session, running it after `delay` seconds"""
+        session = self.sessions[session_id]
+        if not session.paused:
+            return
+        session.paused = False
+        if session_id not in self._in_flight:
+            self._schedule(session, delay)
+
+    def stop(self):
+        """Make `run` return once the runs in flight have finished"""
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def _schedule(self, session: ScheduledSession, delay: float):
+        session._generation += 1
+        self._sequence += 1
+        heapq.heappush(self._queue, (time.monotonic() + delay, self._sequence, session.session_id, session._generation))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _jittered(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def run(self):
+        """Run the sessions until `stop` is called"""
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        slots = asyncio.Semaphore(self.max_concurrency)
+
+        try:
+            while not self._stopping:
+                self._wakeup.clear()
+                delay = self._next_delay()
+                if delay is None or delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                _, _, session_id, generation = heapq.heappop(self._queue)
+                session = self.sessions.get(session_id)
+                if session is None or session.paused or session._generation != generation:
+                    continue
+
+                # wait for a free slot, so a backlog stays in the queue rather than in tasks
+                await slots.acquire()
+                self._in_flight[session_id] = asyncio.ensure_future(self._run_session(session, slots))
+        finally:
+            if self._in_flight:
+                await asyncio.gather(*self._in_flight.values(), return_exceptions=True)
+            self._wakeup = None
+
+    def _next_delay(self) -> Optional[float]:
+        if not self._queue:
+            return None
+        return max(0.0, self._queue[0][0] - time.monotonic())
+
+    async def _run_session(self, session: ScheduledSession, slots: asyncio.Semaphore):
+        try:
+            event = session.event
+            if callable(event):
+                event = event(session.session_id)
+                if inspect.isawaitable(event):
+                    event = await event
+
+            if session.platform.lower() == "twitter" and event is None and session.task is None:
+                result = await self.agent.asimulate_twitter(session.session_id)
+            else:
+                result = await self.agent.areact(
+                    session_id=session.session_id,
+                    platform=session.platform,
+                    event=event,
+                    task=session.task
+                )
+            session.runs += 1
+            session.last_result = result
+            session.last_error = None
+            await self._notify(self.on_result, session, result)
+        except Exception as e:
+            session.errors += 1
+            session.last_error = e
+            await self._notify(self.on_error, session, e)
+        finally:
+            session.last_run = time.time()
+            slots.release()
+            self._in_flight.pop(session.session_id, None)
+            if self.sessions.get(session.session_id) is session and not session.paused:
+                self._schedule(session, self._jittered(session.interval))
+
+    @staticmethod
+    async def _notify(callback, session: ScheduledSession, value):
+        if callback is None:
+            return
+        try:
+            result = callback(session, value)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"Error in scheduler callback for session {session.session_id}: {e}")
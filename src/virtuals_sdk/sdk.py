@@ -1,118 +1,407 @@
-import requests
+import asyncio
+import time
+from typing import Dict, Optional
+from virtuals_sdk import codec
+from virtuals_sdk.transport import HTTPTransport, AsyncHTTPTransport, default_transport
+from virtuals_sdk.cache import FunctionCatalogCache
+from virtuals_sdk.compression import Compression, compress_request
+from virtuals_sdk.metrics import MetricsHook, get_metrics_hook, record
+from virtuals_sdk.retry import (
+    GameAPIError, RetryPolicy, CircuitBreaker, DEFAULT_RETRY_POLICIES, NO_RETRY, is_transport_error
+)
+
+
+def config_fragment(goal: str, description: str, world_info: str, functions: list, custom_functions: list) -> str:
+    """
+    Serialize the agent configuration shared by simulate, react and deploy
+    as compact JSON object members (without the surrounding braces), so
+    callers such as Agent can build it once and reuse it across calls.
+    """
+    return codec.dumps_str({
+        "goal": goal,
+        "description": description,
+        "worldInfo": world_info,
+        "functions": functions,
+        "customFunctions": [x.toJson() for x in custom_functions]
+    })[1:-1]
+
+
+def _body(fields: dict, config: str) -> bytes:
+    """Build a request body `{"data": {**fields, **config}}` around a pre-serialized config"""
+    members = codec.dumps_str(fields)[1:-1]
+    if members and config:
+        members += ","
+    return ('{"data":{' + members + config + '}}').encode("utf-8")
+
+
+def _simulate_body(session_id: str, config: str) -> bytes:
+    return _body({"sessionId": session_id}, config)
+
+
+def _react_body(session_id: str, config: str, event: str = None, task: str = None, tweet_id: str = None) -> bytes:
+    fields = {"sessionId": session_id}
+
+    if (event):
+        fields["event"] = event
+
+    if (task):
+        fields["task"] = task
+
+    if (tweet_id):
+        fields["tweetId"] = tweet_id
+
+    return _body(fields, config)
+
+
+def _deploy_body(config: str, main_heartbeat: int, reaction_heartbeat: int) -> bytes:
+    return _body({
+        "gameState" : {
+            "mainHeartbeat" : main_heartbeat,
+            "reactionHeartbeat" : reaction_heartbeat,
+        }
+    }, config)
+
+
+def _headers(api_key: str) -> dict:
+    return {"x-api-key": api_key, "Content-Type": "application/json"}
+
+
+def _parse_functions(data: dict) -> dict:
+    functions = {}
+
+    for x in data["data"]:
+        functions[x["fn_name"]] = x["fn_description"]
+
+    return functions
+
+
+def _parse_response(response):
+    if (response.status_code != 200):
+        try:
+            body = codec.loads(response.content)
+        except ValueError:
+            body = response.text
+        raise GameAPIError(body, response.status_code)
+
+    return codec.loads(response.content)
+
+
+def _catalog_headers(api_key: str, cache: FunctionCatalogCache) -> dict:
+    headers = {"x-api-key": api_key}
+    etag = cache.etag
+    if etag:
+        headers["If-None-Match"] = etag
+    return headers
+
+
+def _catalog_response(response, cache: FunctionCatalogCache) -> dict:
+    if response.status_code == 304:
+        functions = cache.revalidated()
+        if functions is not None:
+            return functions
+
+    functions = _parse_functions(_parse_response(response))
+    cache.store(functions, response.headers.get("ETag"))
+    return dict(functions)
 
 
 class GameSDK:
     api_url: str = "https://game-api.virtuals.io/api"
     api_key: str
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, transport: Optional[HTTPTransport] = None, warm_up: bool = False,
+                 functions_cache: Optional[FunctionCatalogCache] = None,
+                 retry_policies: Optional[Dict[str, RetryPolicy]] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 metrics: Optional[MetricsHook] = None,
+                 compression: Optional[Compression] = None):
+        """
+        Args:
+            api_key (str): Your Virtuals API key
+            transport (HTTPTransport): Pooled transport to send requests over.
+                Defaults to a process-wide transport shared by all clients.
+            warm_up (bool): Open a connection to the API at construction
+            functions_cache (FunctionCatalogCache): Cache for the default function
+                catalog. Defaults to an in-memory cache with a 5 minute TTL.
+            retry_policies (Dict[str, RetryPolicy]): Retry policy per endpoint
+                ("functions", "simulate", "react", "deploy"), overriding
+                DEFAULT_RETRY_POLICIES
+            circuit_breaker (CircuitBreaker): Breaker that fails calls fast while
+                the API is down; may be shared between clients
+            metrics (MetricsHook): Receives latency/size/status of every call.
+                Defaults to the hook installed with `set_metrics_hook`, if any.
+            compression (Compression): Compress large request bodies (off by default)
+        """
         self.api_key = api_key
+        self.transport = transport or default_transport()
+        self.functions_cache = functions_cache or FunctionCatalogCache()
+        self.retry_policies = {**DEFAULT_RETRY_POLICIES, **(retry_policies or {})}
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.metrics = metrics
+        self.compression = compression
+
+        if warm_up:
+            self.transport.warm_up(self.api_url)
 
-    def functions(self):
+    def functions(self, refresh: bool = False):
         """
         Get all default functions
+
+        The catalog is served from `functions_cache` while fresh; pass
+        `refresh=True` to revalidate it with the server.
         """
-        response = requests.get(
-            f"{self.api_url}/functions", headers={"x-api-key": self.api_key})
+        if not refresh:
+            functions = self.functions_cache.get()
+            if functions is not None:
+                return functions
 
-        if (response.status_code != 200):
-            raise Exception(response.json())
+        response = self._request(
+            "functions", "get", f"{self.api_url}/functions", headers=_catalog_headers(self.api_key, self.functions_cache))
 
-        functions = {}
+        return _catalog_response(response, self.functions_cache)
 
-        for x in response.json()["data"]:
-            functions[x["fn_name"]] = x["fn_description"]
+    def invalidate_functions_cache(self):
+        """Drop the cached default function catalog"""
+        self.functions_cache.invalidate()
 
-        return functions
+    def _request(self, endpoint: str, method: str, url: str, **kwargs):
+        """Send a request, retrying per the endpoint's policy behind the circuit breaker"""
+        policy = self.retry_policies.get(endpoint, NO_RETRY)
+        metrics = self.metrics or get_metrics_hook()
+        # compressed once, so retries resend the same bytes
+        kwargs, raw_bytes = compress_request(self.compression, kwargs)
+        attempt = 1
+        while True:
+            self.circuit_breaker.before_call()
+            started = time.perf_counter() if metrics is not None else 0.0
+            try:
+                response = self.transport.request(method, url, **kwargs)
+            except Exception as e:
+                if metrics is not None:
+                    record(metrics, "game_api", endpoint, started, kwargs, error=e, raw_bytes=raw_bytes)
+                if not is_transport_error(e):
+                    raise
+                self.circuit_breaker.record_failure()
+                delay = policy.error_delay(attempt, e)
+                if delay is None:
+                    raise
+            else:
+                if metrics is not None:
+                    record(metrics, "game_api", endpoint, started, kwargs, response=response, raw_bytes=raw_bytes)
+                if response.status_code >= 500:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+                delay = policy.response_delay(attempt, response)
+                if delay is None:
+                    return response
+            time.sleep(delay)
+            attempt += 1
 
-    def simulate(self, session_id: str,  goal: str, description: str, world_info: str, functions: list, custom_functions: list):
+    def simulate(self, session_id: str, goal: str = None, description: str = None, world_info: str = None,
+                 functions: list = None, custom_functions: list = None, config: str = None):
         """
         Simulate the agent configuration
+
+        `config` is a pre-serialized configuration from `config_fragment`;
+        when given, the individual configuration arguments are ignored.
         """
-        response = requests.post(
+        if config is None:
+            config = config_fragment(goal, description, world_info, functions or [], custom_functions or [])
+
+        response = self._request(
+            "simulate", "post",
             f"{self.api_url}/simulate",
-            json={
-                "data": {
-                    "sessionId": session_id,
-                    "goal": goal,
-                    "description": description,
-                    "worldInfo": world_info,
-                    "functions": functions,
-                    "customFunctions": [x.toJson() for x in custom_functions]
-                }
-            },
-            headers={"x-api-key": self.api_key}
+            content=_simulate_body(session_id, config),
+            headers=_headers(self.api_key)
         )
 
-        if (response.status_code != 200):
-            raise Exception(response.json())
+        return _parse_response(response)["data"]
 
-        return response.json()["data"]
-
-    def react(self, session_id: str, platform: str, goal: str,
-              description: str, world_info: str, functions: list, custom_functions: list,
-              event: str = None, task: str = None, tweet_id: str = None):
+    def react(self, session_id: str, platform: str, goal: str = None,
+              description: str = None, world_info: str = None, functions: list = None, custom_functions: list = None,
+              event: str = None, task: str = None, tweet_id: str = None, config: str = None):
         """
-        Simulate the agent configuration
+        React to an event
+
+        `config` is a pre-serialized configuration from `config_fragment`;
+        when given, the individual configuration arguments are ignored.
         """
-        url = f"{self.api_url}/react/{platform}"
+        if config is None:
+            config = config_fragment(goal, description, world_info, functions or [], custom_functions or [])
 
-        payload = {
-            "sessionId": session_id,
-            "goal": goal,
-            "description": description,
-            "worldInfo": world_info,
-            "functions": functions,
-            "customFunctions": [x.toJson() for x in custom_functions]
-        }
+        response = self._request(
+            "react", "post",
+            f"{self.api_url}/react/{platform}",
+            content=_react_body(session_id, config, event=event, task=task, tweet_id=tweet_id),
+            headers=_headers(self.api_key)
+        )
+
+        return _parse_response(response)["data"]
+
+    def deploy(self, goal: str = None, description: str = None, world_info: str = None, functions: list = None,
+               custom_functions: list = None, main_heartbeat: int = 15, reaction_heartbeat: int = 5, config: str = None):
+        """
+        Deploy the agent configuration
+        """
+        if config is None:
+            config = config_fragment(goal, description, world_info, functions or [], custom_functions or [])
 
-        if (event):
-            payload["event"] = event
-
-        if (task):
-            payload["task"] = task
-            
-        if (tweet_id):
-            payload["tweetId"] = tweet_id
-            
-        print(payload)
-
-        response = requests.post(
-            url,
-            json={
-                "data": payload
-            },
-            headers={"x-api-key": self.api_key}
+        response = self._request(
+            "deploy", "post",
+            f"{self.api_url}/deploy",
+            content=_deploy_body(config, main_heartbeat, reaction_heartbeat),
+            headers=_headers(self.api_key)
         )
 
-        if (response.status_code != 200):
-            raise Exception(response.json())
+        return _parse_response(response)["data"]
+
+
+class AsyncGameSDK:
+    """
+    asyncio counterpart of GameSDK.
+
+    Requests are sent over a pooled `httpx.AsyncClient`, so a single event
+    loop can drive thousands of concurrent sessions. Requires the `async`
+    extra (`pip install virtuals_sdk[async]`).
+    """
+    api_url: str = GameSDK.api_url
+    api_key: str
+
+    def __init__(self, api_key: str, transport: Optional[AsyncHTTPTransport] = None,
+                 functions_cache: Optional[FunctionCatalogCache] = None,
+                 retry_policies: Optional[Dict[str, RetryPolicy]] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 metrics: Optional[MetricsHook] = None,
+                 compression: Optional[Compression] = None):
+        """
+        Args:
+            api_key (str): Your Virtuals API key
+            transport (AsyncHTTPTransport): Pooled async transport to send requests over
+            functions_cache (FunctionCatalogCache): Cache for the default function catalog
+            retry_policies (Dict[str, RetryPolicy]): Retry policy per endpoint
+            circuit_breaker (CircuitBreaker): Breaker that fails calls fast while the API is down
+            metrics (MetricsHook): Receives latency/size/status of every call
+            compression (Compression): Compress large request bodies (off by default)
+        """
+        self.api_key = api_key
+        self.transport = transport or AsyncHTTPTransport()
+        self.functions_cache = functions_cache or FunctionCatalogCache()
+        self.retry_policies = {**DEFAULT_RETRY_POLICIES, **(retry_policies or {})}
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.metrics = metrics
+        self.compression = compression
+
+    async def warm_up(self) -> bool:
+        """Open a connection to the API ahead of the first call"""
+        return await self.transport.warm_up(self.api_url)
 
-        return response.json()["data"]
+    async def aclose(self):
+        await self.transport.aclose()
 
-    def deploy(self, goal: str, description: str, world_info: str, functions: list, custom_functions: list, main_heartbeat: int, reaction_heartbeat: int):
+    async def functions(self, refresh: bool = False):
+        """
+        Get all default functions
+        """
+        if not refresh:
+            functions = self.functions_cache.get()
+            if functions is not None:
+                return functions
+
+        response = await self._request(
+            "functions", "get", f"{self.api_url}/functions", headers=_catalog_headers(self.api_key, self.functions_cache))
+
+        return _catalog_response(response, self.functions_cache)
+
+    def invalidate_functions_cache(self):
+        """Drop the cached default function catalog"""
+        self.functions_cache.invalidate()
+
+    async def _request(self, endpoint: str, method: str, url: str, **kwargs):
+        """Send a request, retrying per the endpoint's policy behind the circuit breaker"""
+        policy = self.retry_policies.get(endpoint, NO_RETRY)
+        metrics = self.metrics or get_metrics_hook()
+        # compressed once, so retries resend the same bytes
+        kwargs, raw_bytes = compress_request(self.compression, kwargs)
+        attempt = 1
+        while True:
+            self.circuit_breaker.before_call()
+            started = time.perf_counter() if metrics is not None else 0.0
+            try:
+                response = await self.transport.request(method, url, **kwargs)
+            except Exception as e:
+                if metrics is not None:
+                    record(metrics, "game_api", endpoint, started, kwargs, error=e, raw_bytes=raw_bytes)
+                if not is_transport_error(e):
+                    raise
+                self.circuit_breaker.record_failure()
+                delay = policy.error_delay(attempt, e)
+                if delay is None:
+                    raise
+            else:
+                if metrics is not None:
+                    record(metrics, "game_api", endpoint, started, kwargs, response=response, raw_bytes=raw_bytes)
+                if response.status_code >= 500:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+                delay = policy.response_delay(attempt, response)
+                if delay is None:
+                    return response
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def simulate(self, session_id: str, goal: str = None, description: str = None, world_info: str = None,
+                       functions: list = None, custom_functions: list = None, config: str = None):
         """
         Simulate the agent configuration
         """
-        response = requests.post(
-            f"{self.api_url}/deploy",
-            json={
-                "data": {
-                    "goal": goal,
-                    "description": description,
-                    "worldInfo": world_info,
-                    "functions": functions,
-                    "customFunctions": custom_functions,
-                    "gameState" : {
-                        "mainHeartbeat" : main_heartbeat,
-                        "reactionHeartbeat" : reaction_heartbeat,
-                    }
-                }
-            },
-            headers={"x-api-key": self.api_key}
+        if config is None:
+            config = config_fragment(goal, description, world_info, functions or [], custom_functions or [])
+
+        response = await self._request(
+            "simulate", "post",
+            f"{self.api_url}/simulate",
+            content=_simulate_body(session_id, config),
+            headers=_headers(self.api_key)
         )
 
-        if (response.status_code != 200):
-            raise Exception(response.json())
+        return _parse_response(response)["data"]
+
+    async def react(self, session_id: str, platform: str, goal: str = None,
+                    description: str = None, world_info: str = None, functions: list = None, custom_functions: list = None,
+                    event: str = None, task: str = None, tweet_id: str = None, config: str = None):
+        """
+        React to an event
+
+        `config` is a pre-serialized configuration from `config_fragment`;
+        when given, the individual configuration arguments are ignored.
+        """
+        if config is None:
+            config = config_fragment(goal, description, world_info, functions or [], custom_functions or [])
+
+        response = await self._request(
+            "react", "post",
+            f"{self.api_url}/react/{platform}",
+            content=_react_body(session_id, config, event=event, task=task, tweet_id=tweet_id),
+            headers=_headers(self.api_key)
+        )
+
+        return _parse_response(response)["data"]
+
+    async def deploy(self, goal: str = None, description: str = None, world_info: str = None, functions: list = None,
+                     custom_functions: list = None, main_heartbeat: int = 15, reaction_heartbeat: int = 5, config: str = None):
+        """
+        Deploy the agent configuration
+        """
+        if config is None:
+            config = config_fragment(goal, description, world_info, functions or [], custom_functions or [])
+
+        response = await self._request(
+            "deploy", "post",
+            f"{self.api_url}/deploy",
+            content=_deploy_body(config, main_heartbeat, reaction_heartbeat),
+            headers=_headers(self.api_key)
+        )
 
-        return response.json()["data"]
+        return _parse_response(response)["data"]
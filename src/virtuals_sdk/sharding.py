@@ -0,0 +1,448 @@
+import asyncio
+import bisect
+import hashlib
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+from virtuals_sdk.scheduler import ScheduledSession, SessionScheduler
+
+if TYPE_CHECKING:
+    from virtuals_sdk.game import Agent
+
+
+def _point(key: str) -> int:
+    # stable across processes and restarts, unlike hash()
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys (session ids) to nodes.
+
+    Every node owns `replicas` points on the ring, and a key belongs to
+    the first point after its own hash. Adding or removing a node only
+    moves the keys of that node, so session affinity survives resizing
+    the pool between deployments.
+    """
+
+    def __init__(self, nodes: Iterable[Any] = (), replicas: int = 64):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: List[Any] = []
+        self.nodes: List[Any] = []
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node: Any):
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for replica in range(self.replicas):
+            point = _point(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove_node(self, node: Any):
+        self.nodes.remove(node)
+        kept = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != node]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def node_for(self, key: str) -> Any:
+        if not self._points:
+            raise ValueError("The hash ring has no nodes")
+        index = bisect.bisect(self._points, _point(key)) % len(self._points)
+        return self._owners[index]
+
+
+class _ShardWorker:
+    """Runs inside a worker process: a SessionScheduler plus ordered one-off events"""
+
+    def __init__(self, index: int, agent: "Agent", results, max_concurrency: int, jitter: float,
+                 heartbeat_unit: float, send_results: bool):
+        self.index = index
+        self.agent = agent
+        self.results = results
+        self.send_results = send_results
+        self.max_concurrency = max_concurrency
+        self.scheduler = SessionScheduler(
+            agent,
+            max_concurrency=max_concurrency,
+            jitter=jitter,
+            heartbeat_unit=heartbeat_unit,
+            on_result=self._on_scheduled_result,
+            on_error=self._on_scheduled_error
+        )
+        # events waiting per session; a session has one drain task at a time
+        self._backlog: Dict[str, Deque[Tuple[int, str, Optional[str], Optional[str]]]] = {}
+        self._drains: List[asyncio.Future] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _report(self, kind: str, session_id: str, event_id: Optional[int], value: Any):
+        if kind == "error":
+            try:
+                pickle.dumps(value)
+            except Exception:
+                value = RuntimeError(f"{type(value).__name__}: {value}")
+        elif not self.send_results:
+            value = None
+        self.results.put((kind, self.index, session_id, event_id, value))
+
+    def _on_scheduled_result(self, session: ScheduledSession, response: Any):
+        self._report("result", session.session_id, None, response)
+
+    def _on_scheduled_error(self, session: ScheduledSession, error: BaseException):
+        self._report("error", session.session_id, None, error)
+
+    def _submit(self, event_id: int, session_id: str, platform: str, event: Optional[str], task: Optional[str]):
+        backlog = self._backlog.get(session_id)
+        if backlog is not None:
+            backlog.append((event_id, platform, event, task))
+            return
+        self._backlog[session_id] = deque([(event_id, platform, event, task)])
+        self._drains.append(asyncio.ensure_future(self._drain(session_id)))
+
+    async def _drain(self, session_id: str):
+        backlog = self._backlog[session_id]
+        try:
+            while backlog:
+                event_id, platform, event, task = backlog[0]
+                async with self._slots:
+                    try:
+                        response = await self.agent.areact(session_id=session_id, platform=platform,
+                                                           event=event, task=task)
+                        self._report("result", session_id, event_id, response)
+                    except Exception as e:
+                        self._report("error", session_id, event_id, e)
+                backlog.popleft()
+        finally:
+            del self._backlog[session_id]
+
+    async def run(self, commands):
+        loop = asyncio.get_event_loop()
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        scheduler = asyncio.ensure_future(self.scheduler.run())
+        self.results.put(("started", self.index, None, None, os.getpid()))
+        while True:
+            command = await loop.run_in_executor(None, commands.get)
+            kind = command[0]
+            if kind == "add":
+                self.scheduler.add_session(**command[1])
+            elif kind == "remove":
+                if command[1] in self.scheduler.sessions:
+                    self.scheduler.remove_session(command[1])
+            elif kind == "react":
+                self._submit(*command[1:])
+            elif kind == "stop":
+                break
+            self._drains = [drain for drain in self._drains if not drain.done()]
+        self.scheduler.stop()
+        await asyncio.gather(scheduler, *self._drains, return_exceptions=True)
+
+
+def _worker_main(index: int, agent_factory: Callable[[], "Agent"], commands, results, options: Dict[str, Any]):
+    agent = agent_factory()
+    worker = _ShardWorker(index, agent, results, **options)
+    asyncio.run(worker.run(commands))
+
+
+class _WorkerSlot:
+    """The supervisor's view of one worker process"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.commands = None
+        self.pid: Optional[int] = None
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        # react events sent but not answered yet, resent if the worker dies,
+        # with the number of times they were sent
+        self.unacked: "OrderedDict[int, List]" = OrderedDict()
+        self.starts = 0
+        self.restarts = 0
+        self.results = 0
+        self.errors = 0
+        self.restart_at: Optional[float] = None
+        self.restart_delay = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "pid": self.pid,
+            "alive": self.process is not None and self.process.is_alive(),
+            "sessions": len(self.sessions),
+            "pending_events": len(self.unacked),
+            "results": self.results,
+            "errors": self.errors,
+            "restarts": self.restarts,
+        }
+
+
+class ShardedScheduler:
+    """
+    Spreads agent sessions over a pool of worker processes.
+
+    One process is bound by the GIL for JSON and template work; this runs
+    a SessionScheduler in each of `processes` workers instead, so react
+    throughput scales with the cores. Sessions are assigned to workers
+    with a consistent hash ring, so a session always runs in the same
+    process and its events are reacted to in order.
+
+    The supervisor (the process calling `run`) restarts workers that
+    crash, re-adding their sessions and resending the events they had not
+    answered, and calls `on_result`/`on_error` for every run, so state
+    can be saved from a single process. `stats` aggregates the workers.
+
+    `agent_factory` is called once in every worker to build its Agent. It
+    must be picklable, e.g. a module-level function or a
+    `functools.partial` of one, since workers are spawned processes.
+
+    Example:
+        def make_agent():
+            return Agent(api_key=os.environ["VIRTUALS_API_KEY"], goal=goal, description=description)
+
+        if __name__ == "__main__":
+            sharded = ShardedScheduler(make_agent, processes=8)
+            for chat_id in chats:
+                sharded.add_session(f"tg-{chat_id}", "telegram", task="Engage with the chat")
+            sharded.run()
+    """
+
+    def __init__(
+        self,
+        agent_factory: Callable[[], "Agent"],
+        processes: Optional[int] = None,
+        max_concurrency: int = 100,
+        jitter: float = 0.1,
+        heartbeat_unit: float = 60.0,
+        on_result: Optional[Callable[[str, Any], Any]] = None,
+        on_error: Optional[Callable[[str, BaseException], Any]] = None,
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 60.0,
+        max_deliveries: int = 3,
+        replicas: int = 64,
+        start_method: str = "spawn"
+    ):
+        """
+        Args:
+            agent_factory: Builds the Agent of a worker process
+            processes (int): Number of worker processes, the number of CPUs by default
+            max_concurrency (int): Maximum number of runs in flight per worker
+            jitter (float): Random +/- fraction applied to every interval
+            heartbeat_unit (float): Seconds per heartbeat unit (minutes by default)
+            on_result: Called in the supervisor with the session id and the GAME response
+            on_error: Called in the supervisor with the session id and the exception
+            restart_delay (float): Seconds before restarting a crashed worker, doubled
+                for every crash in a row up to `max_restart_delay`
+            max_restart_delay (float): Longest wait before a restart
+            max_deliveries (int): Times an event is sent to workers that crash before
+                it is given up on (reported to `on_error`), so one event that crashes
+                its worker cannot keep it restarting
+            replicas (int): Points per worker on the hash ring
+            start_method (str): multiprocessing start method for the workers
+        """
+        processes = processes or os.cpu_count() or 1
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+        self.agent_factory = agent_factory
+        self.processes = processes
+        self.on_result = on_result
+        self.on_error = on_error
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.max_deliveries = max_deliveries
+        self._options = {
+            "max_concurrency": max_concurrency,
+            "jitter": jitter,
+            "heartbeat_unit": heartbeat_unit,
+            "send_results": on_result is not None,
+        }
+        self._context = multiprocessing.get_context(start_method)
+        self.ring = HashRing(range(processes), replicas=replicas)
+        self._workers = [_WorkerSlot(index) for index in range(processes)]
+        self._results = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._event_ids = 0
+
+    def worker_for(self, session_id: str) -> int:
+        """Index of the worker process a session runs in"""
+        return self.ring.node_for(session_id)
+
+    def add_session(self, session_id: str, platform: str, task: Optional[str] = None,
+                    event: Optional[str] = None, interval: Optional[float] = None):
+        """
+        Schedule a session on its worker, see `SessionScheduler.add_session`.
+        A callable `event` must be picklable.
+        """
+        worker = self._workers[self.worker_for(session_id)]
+        session = {"session_id": session_id, "platform": platform, "task": task, "event": event, "interval": interval}
+        with self._lock:
+            worker.sessions[session_id] = session
+            self._send(worker, ("add", session))
+
+    def remove_session(self, session_id: str):
+        worker = self._workers[self.worker_for(session_id)]
+        with self._lock:
+            if worker.sessions.pop(session_id, None) is not None:
+                self._send(worker, ("remove", session_id))
+
+    def react(self, session_id: str, platform: str, event: Optional[str] = None, task: Optional[str] = None):
+        """
+        Queue one `react` call on the session's worker. Events of a session
+        are reacted to in the order they were queued; the response goes to
+        `on_result`. Safe to call from any thread while `run` is running.
+        """
+        worker = self._workers[self.worker_for(session_id)]
+        with self._lock:
+            self._event_ids += 1
+            command = ("react", self._event_ids, session_id, platform, event, task)
+            worker.unacked[self._event_ids] = [command, 1]
+            self._send(worker, command)
+
+    @staticmethod
+    def _send(worker: _WorkerSlot, command: Tuple):
+        # before the workers start, commands are sent by `_start_worker`
+        if worker.commands is not None:
+            worker.commands.put(command)
+
+    def _start_worker(self, worker: _WorkerSlot):
+        worker.commands = self._context.Queue()
+        for session in worker.sessions.values():
+            worker.commands.put(("add", session))
+        for command, _ in worker.unacked.values():
+            worker.commands.put(command)
+        worker.process = self._context.Process(
+            target=_worker_main,
+            args=(worker.index, self.agent_factory, worker.commands, self._results, self._options),
+            name=f"agent-shard-{worker.index}",
+            daemon=True
+        )
+        worker.process.start()
+        worker.starts += 1
+
+    def run(self, poll_interval: float = 0.5):
+        """Run the workers until `stop` is called (e.g. from a callback or a signal handler)"""
+        self._stopping.clear()
+        self._results = self._context.Queue()
+        with self._lock:
+            for worker in self._workers:
+                self._start_worker(worker)
+        try:
+            while not self._stopping.is_set():
+                self._receive(poll_interval)
+                self._supervise()
+        finally:
+            self._shutdown()
+
+    def stop(self):
+        """Make `run` return once the workers have finished the runs in flight"""
+        self._stopping.set()
+
+    def _receive(self, timeout: float):
+        try:
+            message = self._results.get(timeout=timeout)
+        except queue.Empty:
+            return
+        while message is not None:
+            self._handle(message)
+            try:
+                message = self._results.get_nowait()
+            except queue.Empty:
+                message = None
+
+    def _handle(self, message: Tuple):
+        kind, index, session_id, event_id, value = message
+        if kind == "started":
+            self._workers[index].pid = value
+            return
+        if index is not None:
+            worker = self._workers[index]
+            with self._lock:
+                if event_id is not None:
+                    worker.unacked.pop(event_id, None)
+                if kind == "result":
+                    worker.results += 1
+                else:
+                    worker.errors += 1
+                # a worker that gets work done is healthy again
+                worker.restart_delay = 0.0
+        callback = self.on_result if kind == "result" else self.on_error
+        if callback is not None:
+            try:
+                callback(session_id, value)
+            except Exception as e:
+                print(f"Error in sharded scheduler callback for session {session_id}: {e}")
+        elif kind == "error":
+            print(f"Error in agent shard {index} for session {session_id}: {value}")
+
+    def _supervise(self):
+        now = time.monotonic()
+        given_up = []
+        with self._lock:
+            for worker in self._workers:
+                if worker.process.is_alive() or self._stopping.is_set():
+                    continue
+                if worker.restart_at is None:
+                    worker.restart_delay = min(self.max_restart_delay, max(self.restart_delay, worker.restart_delay * 2))
+                    worker.restart_at = now + worker.restart_delay
+                    print(f"Agent shard {worker.index} exited with code {worker.process.exitcode}, "
+                          f"restarting in {worker.restart_delay:.1f}s")
+                elif now >= worker.restart_at:
+                    worker.restart_at = None
+                    worker.restarts += 1
+                    worker.commands.close()
+                    given_up.extend(self._redeliver(worker))
+                    self._start_worker(worker)
+        for session_id, error in given_up:
+            self._handle(("error", None, session_id, None, error))
+
+    def _redeliver(self, worker: _WorkerSlot) -> List[Tuple[str, BaseException]]:
+        given_up = []
+        for event_id, delivery in list(worker.unacked.items()):
+            command, deliveries = delivery
+            if deliveries >= self.max_deliveries:
+                del worker.unacked[event_id]
+                worker.errors += 1
+                given_up.append((command[2], RuntimeError(
+                    f"Event {event_id} was given up on after {deliveries} worker crashes")))
+            else:
+                delivery[1] += 1
+        return given_up
+
+    def _shutdown(self, timeout: float = 30.0):
+        for worker in self._workers:
+            if worker.process is not None and worker.process.is_alive():
+                worker.commands.put(("stop",))
+        deadline = time.monotonic() + timeout
+        # keep reading results: a worker cannot exit with unflushed queue data
+        while any(worker.process.is_alive() for worker in self._workers) and time.monotonic() < deadline:
+            self._receive(0.1)
+        for worker in self._workers:
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.process.join()
+            worker.commands.close()
+            worker.commands = None
+        self._receive(0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Totals over all workers, and per-worker statistics under "workers" """
+        with self._lock:
+            workers = [worker.stats() for worker in self._workers]
+        return {
+            "processes": self.processes,
+            "alive": sum(worker["alive"] for worker in workers),
+            "sessions": sum(worker["sessions"] for worker in workers),
+            "pending_events": sum(worker["pending_events"] for worker in workers),
+            "results": sum(worker["results"] for worker in workers),
+            "errors": sum(worker["errors"] for worker in workers),
+            "restarts": sum(worker["restarts"] for worker in workers),
+            "workers": workers,
+        }
@@ -0,0 +1,268 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+
+
+class StateStore(ABC):
+    """
+    Per-session state storage for long-running agents.
+
+    State is a JSON-serializable dict per session id. `update` merges the
+    given keys into the session's state, so callers only write what
+    changed rather than the whole state. Backends implement `get`,
+    `update`, `delete` and `sessions`.
+    """
+
+    @abstractmethod
+    def get(self, session_id: str) -> Dict[str, Any]:
+        """Get a copy of a session's state (empty if unknown)"""
+
+    @abstractmethod
+    def update(self, session_id: str, changes: Dict[str, Any]):
+        """Merge `changes` into a session's state"""
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        """Forget a session"""
+
+    @abstractmethod
+    def sessions(self) -> Dict[str, Dict[str, Any]]:
+        """Get the state of every session"""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _atomic_write_json(path: str, data: Any):
+    """Write JSON to `path` so that readers and crashes never see a partial file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".state-")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class JSONFileStateStore(StateStore):
+    """
+    All sessions in one JSON file, rewritten (atomically) on every update.
+    Simple, but O(total state) I/O per update; suited to a few sessions.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r') as f:
+                self._sessions: Dict[str, Dict[str, Any]] = json.load(f)
+        except FileNotFoundError:
+            self._sessions = {}
+
+    def get(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._sessions.get(session_id, {}))
+
+    def update(self, session_id: str, changes: Dict[str, Any]):
+        with self._lock:
+            self._sessions.setdefault(session_id, {}).update(changes)
+            _atomic_write_json(self.path, self._sessions)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            if self._sessions.pop(session_id, None) is not None:
+                _atomic_write_json(self.path, self._sessions)
+
+    def sessions(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {session_id: dict(state) for session_id, state in self._sessions.items()}
+
+
+class JournalStateStore(StateStore):
+    """
+    Append-only journal with periodic compaction.
+
+    Each update appends one line with only the changed keys to
+    `<path>.journal`, so writes are O(change). Every `compact_every`
+    appended lines the full state is written atomically to the snapshot
+    at `path` and the journal is truncated. On start the snapshot is
+    loaded and the journal replayed; a line torn by a crash is ignored.
+    """
+
+    def __init__(self, path: str, compact_every: int = 1000, fsync: bool = False):
+        """
+        Args:
+            path (str): Snapshot file; the journal lives next to it
+            compact_every (int): Journal lines between compactions
+            fsync (bool): fsync after every append, trading speed for durability
+        """
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Dict[str, Any]] = self._load_snapshot()
+        self._journal_lines = self._replay_journal()
+        self._journal = open(self.journal_path, 'a')
+
+    def _load_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        if not isinstance(data, dict) or not isinstance(data.get("sessions"), dict):
+            # e.g. a state file written by an older AgentRunner; keep it aside
+            os.replace(self.path, self.path + ".bak")
+            print(f"{self.path} is not a state snapshot, moved it to {self.path}.bak")
+            return {}
+        return data["sessions"]
+
+    def _replay_journal(self) -> int:
+        lines = 0
+        good_size = 0
+        try:
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated journal line")
+                        entry = json.loads(line)
+                    except ValueError:
+                        # torn write from a crash: drop it, or later appends would follow it
+                        os.truncate(self.journal_path, good_size)
+                        break
+                    self._apply(entry)
+                    good_size += len(line)
+                    lines += 1
+        except FileNotFoundError:
+            pass
+        return lines
+
+    def _apply(self, entry: Dict[str, Any]):
+        if entry.get("deleted"):
+            self._sessions.pop(entry["session"], None)
+        else:
+            self._sessions.setdefault(entry["session"], {}).update(entry["changes"])
+
+    def _append(self, entry: Dict[str, Any]):
+        self._journal.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        self._journal_lines += 1
+        if self._journal_lines >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        _atomic_write_json(self.path, {"sessions": self._sessions})
+        # replaying the journal on top of the new snapshot is harmless, so a
+        # crash before the truncation below loses nothing
+        self._journal.close()
+        self._journal = open(self.journal_path, 'w')
+        self._journal_lines = 0
+
+    def compact(self):
+        """Write a snapshot and truncate the journal now"""
+        with self._lock:
+            self._compact()
+
+    def get(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._sessions.get(session_id, {}))
+
+    def update(self, session_id: str, changes: Dict[str, Any]):
+        with self._lock:
+            entry = {"session": session_id, "changes": changes}
+            self._append(entry)
+            self._apply(entry)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            entry = {"session": session_id, "deleted": True}
+            self._append(entry)
+            self._apply(entry)
+
+    def sessions(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {session_id: dict(state) for session_id, state in self._sessions.items()}
+
+    def close(self):
+        with self._lock:
+            if not self._journal.closed:
+                self._compact()
+                self._journal.close()
+
+
+class SQLiteStateStore(StateStore):
+    """
+    Sessions in a SQLite database, one row per session key, so updates
+    touch only the changed keys and every update is one atomic
+    transaction. Uses WAL mode; safe to share between threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS session_state ("
+            "session_id TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (session_id, key))"
+        )
+
+    def get(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, value FROM session_state WHERE session_id = ?", (session_id,)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def update(self, session_id: str, changes: Dict[str, Any]):
+        rows = [(session_id, key, json.dumps(value, separators=(",", ":"))) for key, value in changes.items()]
+        with self._lock:
+            with self._db:
+                self._db.execute("BEGIN")
+                self._db.executemany(
+                    "INSERT INTO session_state (session_id, key, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (session_id, key) DO UPDATE SET value = excluded.value",
+                    rows
+                )
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM session_state WHERE session_id = ?", (session_id,))
+
+    def sessions(self) -> Dict[str, Dict[str, Any]]:
+        sessions: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            rows = self._db.execute("SELECT session_id, key, value FROM session_state").fetchall()
+        for session_id, key, value in rows:
+            sessions.setdefault(session_id, {})[key] = json.loads(value)
+        return sessions
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def open_state_store(path: str) -> StateStore:
+    """Pick a backend from the file name: `.db`/`.sqlite` -> SQLite, anything else -> journal"""
+    if os.path.splitext(path)[1] in (".db", ".sqlite", ".sqlite3"):
+        return SQLiteStateStore(path)
+    return JournalStateStore(path)
@@ -0,0 +1,118 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([^{}]+?)\s*\}\}")
+_PATH_TOKEN = re.compile(r"\[(-?\d+)\]|\[['\"]([^'\"]*)['\"]\]|([^.\[\]]+)")
+_MISSING = object()
+
+Path = Tuple[Union[str, int], ...]
+
+
+def parse_path(expression: str) -> Path:
+    """
+    Split a placeholder expression into lookup keys.
+
+    `response.result.message_id` -> ("response", "result", "message_id")
+    `response.result[0].id`      -> ("response", "result", 0, "id")
+    """
+    path = []
+    for match in _PATH_TOKEN.finditer(expression):
+        index, quoted, name = match.groups()
+        if index is not None:
+            path.append(int(index))
+        elif quoted is not None:
+            path.append(quoted)
+        elif name.lstrip("-").isdigit():
+            path.append(int(name))
+        else:
+            path.append(name)
+    return tuple(path)
+
+
+def resolve(values: Dict[str, Any], path: Path) -> Any:
+    """Look up a parsed path in `values`, returning `_MISSING` when any step fails"""
+    value: Any = values
+    for key in path:
+        if isinstance(value, dict):
+            if key in value:
+                value = value[key]
+            elif isinstance(key, int) and str(key) in value:
+                # numeric-looking keys of JSON objects are strings
+                value = value[str(key)]
+            else:
+                return _MISSING
+        elif isinstance(value, (list, tuple)) and isinstance(key, int):
+            try:
+                value = value[key]
+            except IndexError:
+                return _MISSING
+        else:
+            return _MISSING
+    return value
+
+
+class CompiledTemplate:
+    """
+    A `{{placeholder}}` template parsed once into static segments and
+    lookup slots, so rendering is a single pass with no parsing.
+
+    Placeholders may be dotted or indexed paths into the values, e.g.
+    `{{response.result.message_id}}` or `{{response.result[0].id}}`.
+    Placeholders that cannot be resolved are left in the output as-is.
+    """
+    __slots__ = ("source", "_segments", "_direct")
+
+    def __init__(self, source: str):
+        self.source = source
+        # static text is stored as str, slots as (path, original placeholder)
+        self._segments: List[Union[str, Tuple[Path, str]]] = []
+
+        position = 0
+        for match in _PLACEHOLDER.finditer(source):
+            if match.start() > position:
+                self._segments.append(source[position:match.start()])
+            self._segments.append((parse_path(match.group(1)), match.group(0)))
+            position = match.end()
+        if position < len(source):
+            self._segments.append(source[position:])
+
+        # a template made of exactly one placeholder can hand back the raw value
+        self._direct: Optional[Path] = None
+        if len(self._segments) == 1 and isinstance(self._segments[0], tuple):
+            self._direct = self._segments[0][0]
+
+    @property
+    def is_static(self) -> bool:
+        return all(isinstance(segment, str) for segment in self._segments)
+
+    def render(self, values: Dict[str, Any]) -> str:
+        """Render the template to a string"""
+        parts = []
+        for segment in self._segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+            else:
+                value = resolve(values, segment[0])
+                parts.append(segment[1] if value is _MISSING else str(value))
+        return "".join(parts)
+
+    def render_value(self, values: Dict[str, Any]) -> Any:
+        """
+        Render the template, but return the referenced value unchanged
+        (e.g. a list or bool) when the template is a single placeholder
+        """
+        if self._direct is not None:
+            value = resolve(values, self._direct)
+            if value is not _MISSING:
+                return value
+        return self.render(values)
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate({self.source!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_template(source: str) -> CompiledTemplate:
+    """Compile a template, sharing the result between identical sources"""
+    return CompiledTemplate(source)
@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import weakref
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HTTPTransport:
+    """
+    A pooled, keep-alive HTTP transport backed by a `requests.Session`.
+
+    Connections are pooled per host and reused across calls, so repeated
+    requests to the same API skip the TCP+TLS handshake. A transport is
+    safe to share across threads and across many GameSDK/Agent instances.
+
+    Example:
+        transport = HTTPTransport(pool_maxsize=32)
+        agent_a = Agent(api_key, transport=transport)
+        agent_b = Agent(api_key, transport=transport)
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        timeout: Optional[float] = 60,
+        max_retries: int = 0,
+        session: Optional[requests.Session] = None
+    ):
+        """
+        Args:
+            pool_connections (int): Number of distinct hosts to keep pools for
+            pool_maxsize (int): Maximum number of kept-alive connections per host
+            timeout (float): Default timeout in seconds for every request
+            max_retries (int): Connection-level retries done by urllib3
+            session (requests.Session): Optional pre-configured session to use
+        """
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        # cookies are the only mutable per-request state on a Session; the
+        # APIs we talk to are header-authenticated, so never persist them
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request over a pooled connection. Accepts the keyword arguments
+        of `requests.request`; a raw body may also be given as `content`, as
+        with AsyncHTTPTransport.
+        """
+        if "content" in kwargs:
+            kwargs["data"] = kwargs.pop("content")
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def warm_up(self, url: str) -> bool:
+        """
+        Open a connection to the host of `url` ahead of time so the first
+        real call does not pay for the handshake. Errors are ignored.
+        """
+        try:
+            self.session.head(url, timeout=self.timeout)
+            return True
+        except requests.exceptions.RequestException:
+            return False
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default_transport: Optional[HTTPTransport] = None
+_default_transport_lock = threading.Lock()
+
+
+def default_transport() -> HTTPTransport:
+    """Get the process-wide transport shared by clients created without one"""
+    global _default_transport
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                _default_transport = HTTPTransport()
+    return _default_transport
+
+
+class AsyncHTTPTransport:
+    """
+    A pooled, keep-alive asyncio HTTP transport backed by `httpx.AsyncClient`.
+
+    Requires the `async` extra (`pip install virtuals_sdk[async]`). A
+    transport is bound to the event loop it is first used on; share it
+    between the clients running on that loop.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        timeout: Optional[float] = 60,
+        http2: bool = False,
+        client=None
+    ):
+        """
+        Args:
+            max_connections (int): Maximum number of concurrent connections
+            max_keepalive_connections (int): Maximum number of idle connections kept alive
+            timeout (float): Default timeout in seconds for every request
+            http2 (bool): Negotiate HTTP/2 where the server supports it (requires `h2`)
+            client (httpx.AsyncClient): Optional pre-configured client to use
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError(
+                "AsyncHTTPTransport requires httpx. Install it with: pip install virtuals_sdk[async]"
+            )
+
+        self.timeout = timeout
+        self.client = client or httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            ),
+            timeout=timeout,
+            http2=http2
+        )
+
+    async def request(self, method: str, url: str, **kwargs):
+        """
+        Send a request over a pooled connection. Accepts the keyword arguments
+        of `httpx.AsyncClient.request`; a raw str/bytes body may also be given
+        as `data`, as with HTTPTransport.
+        """
+        if isinstance(kwargs.get("data"), (str, bytes)):
+            kwargs["content"] = kwargs.pop("data")
+        return await self.client.request(method, url, **kwargs)
+
+    async def warm_up(self, url: str) -> bool:
+        """
+        Open a connection to the host of `url` ahead of time so the first
+        real call does not pay for the handshake. Errors are ignored.
+        """
+        import httpx
+
+        try:
+            await self.client.head(url)
+            return True
+        except httpx.HTTPError:
+            return False
+
+    async def aclose(self):
+        """Close all pooled connections"""
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+_default_async_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHTTPTransport]" = weakref.WeakKeyDictionary()
+
+
+def default_async_transport() -> AsyncHTTPTransport:
+    """
+    Get the async transport shared by clients created without one. As
+    connections belong to an event loop, there is one per running loop.
+    """
+    loop = asyncio.get_running_loop()
+    transport = _default_async_transports.get(loop)
+    if transport is None:
+        transport = _default_async_transports[loop] = AsyncHTTPTransport()
+    return transport
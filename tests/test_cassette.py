@@ -0,0 +1,57 @@
+import requests
+
+from virtuals_sdk.cassette import Cassette, CassetteTransport, redact_body
+from virtuals_sdk.functions.discord import DiscordClient
+from virtuals_sdk.functions.telegram import TelegramClient
+from virtuals_sdk.game import Agent
+
+
+class FakeTransport:
+    """Answers every request with the same GAME response"""
+
+    def __init__(self):
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"data":{"action":"wait"}}'
+        response.headers["Content-Type"] = "application/json"
+        return response
+
+
+def agent_with_tokens(token: str, transport) -> Agent:
+    agent = Agent("api-key", goal="goal", description="description", transport=transport)
+    agent.add_custom_function(TelegramClient(token).get_function("send_message"))
+    agent.add_custom_function(DiscordClient(token).get_function("send_message"))
+    return agent
+
+
+def test_redact_body():
+    body = {
+        "url": "https://api.telegram.org/bot111:REAL/sendMessage",
+        "headersString": '{"Content-Type":"application/json","Authorization":"Bot 111:REAL"}',
+        "headers": {"authorization": "Bot 111:REAL"},
+    }
+    assert redact_body(body) == {
+        "url": "https://api.telegram.org/bot<token>/sendMessage",
+        "headersString": '{"Content-Type":"application/json","Authorization":"<token>"}',
+        "headers": {"authorization": "<token>"},
+    }
+
+
+def test_replay_with_another_token(tmp_path):
+    path = str(tmp_path / "simulate.jsonl")
+    upstream = FakeTransport()
+    with Cassette(path, mode="record") as cassette:
+        recorded = agent_with_tokens("111:REAL", CassetteTransport(cassette, upstream)).simulate_twitter("session")
+    assert len(upstream.requests) == 1
+    # the token was in the request body, but must not leak into the cassette
+    with open(path, encoding="utf-8") as f:
+        assert "111:REAL" not in f.read()
+
+    with Cassette(path, mode="replay") as cassette:
+        replayed = agent_with_tokens("222:CI", CassetteTransport(cassette)).simulate_twitter("session")
+        assert cassette.hits == 1
+    assert replayed == recorded
@@ -0,0 +1,196 @@
+import asyncio
+import random
+from http import HTTPStatus
+
+import pytest
+
+websockets = pytest.importorskip("websockets")
+
+from virtuals_sdk import codec
+from virtuals_sdk.ingest import discord
+from virtuals_sdk.ingest.discord import DiscordGatewayConsumer, GatewayError
+
+TOKEN = "bot-token"
+MESSAGE = {"id": "m1", "channel_id": "c1", "content": "hello", "author": {"id": "u1", "username": "alice"}}
+
+
+class FakeAgent:
+    def __init__(self):
+        self.calls = []
+
+    async def areact(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"ok": True}
+
+
+class Gateway:
+    """
+    Local stand-in for the Discord gateway: each connection is handled by
+    the next scenario coroutine, called with the connection.
+    """
+
+    def __init__(self, *scenarios):
+        self.scenarios = list(scenarios)
+        self.connections = 0
+        self.reject = 0
+        self.url = None
+
+    def process_request(self, connection, request):
+        if self.reject:
+            self.reject -= 1
+            return connection.respond(HTTPStatus.BAD_GATEWAY, "bad gateway\n")
+        return None
+
+    async def handler(self, websocket):
+        self.connections += 1
+        await self.scenarios.pop(0)(self, websocket)
+
+    async def __aenter__(self):
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0, process_request=self.process_request)
+        port = self.server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def send(websocket, op, data=None, sequence=None, event_type=None):
+    await websocket.send(codec.dumps_str({"op": op, "d": data, "s": sequence, "t": event_type}))
+
+
+async def receive(websocket, op):
+    """The next payload with opcode `op`, skipping heartbeats"""
+    while True:
+        payload = codec.loads(await websocket.recv())
+        if payload["op"] == op:
+            return payload
+
+
+async def hello(websocket, interval=45000):
+    await send(websocket, discord.HELLO, {"heartbeat_interval": interval})
+
+
+async def identify(gateway, websocket, interval=45000):
+    await hello(websocket, interval)
+    payload = await receive(websocket, discord.IDENTIFY)
+    assert payload["d"]["token"] == TOKEN
+    await send(websocket, discord.DISPATCH, {"session_id": "s1", "resume_gateway_url": gateway.url,
+                                             "user": {"id": "bot"}}, 1, "READY")
+
+
+async def deliver_message(gateway, websocket):
+    await identify(gateway, websocket)
+    await send(websocket, discord.DISPATCH, MESSAGE, 2, "MESSAGE_CREATE")
+    await websocket.wait_closed()
+
+
+def consume(gateway, agent=None):
+    """Run a consumer against `gateway` until its first message is processed"""
+    consumer = DiscordGatewayConsumer(agent or FakeAgent(), TOKEN, workers=1, gateway_url=gateway.url,
+                                      on_result=lambda *args: consumer.stop())
+    return consumer
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(random, "uniform", lambda a, b: 0)
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 10))
+
+
+def test_identify_ready_dispatch():
+    async def main():
+        agent = FakeAgent()
+        async with Gateway(deliver_message) as gateway:
+            consumer = consume(gateway, agent)
+            await consumer.run()
+        assert consumer.gateway_session_id == "s1"
+        assert consumer.sequence == 2
+        assert agent.calls == [{"session_id": "discord-c1", "platform": "discord",
+                                "event": "Message from user alice: hello", "task": consumer.task,
+                                "delivery_id": "m1"}]
+
+    run(main())
+
+
+def test_resume_after_close():
+    resumed = []
+
+    async def drop_after_ready(gateway, websocket):
+        await identify(gateway, websocket)
+        await websocket.close(4000, "unknown error")
+
+    async def resume(gateway, websocket):
+        await hello(websocket)
+        resumed.append((await receive(websocket, discord.RESUME))["d"])
+        await send(websocket, discord.DISPATCH, {}, 2, "RESUMED")
+        await send(websocket, discord.DISPATCH, MESSAGE, 3, "MESSAGE_CREATE")
+        await websocket.wait_closed()
+
+    async def main():
+        async with Gateway(drop_after_ready, resume) as gateway:
+            consumer = consume(gateway)
+            await consumer.run()
+        assert resumed == [{"token": TOKEN, "session_id": "s1", "seq": 1}]
+        assert consumer.reconnects == 1
+        assert consumer.processed == 1
+
+    run(main())
+
+
+def test_missed_heartbeat_ack_reconnects():
+    close_codes = []
+
+    async def never_ack(gateway, websocket):
+        await identify(gateway, websocket, interval=50)
+        await receive(websocket, discord.HEARTBEAT)
+        await websocket.wait_closed()
+        close_codes.append(websocket.close_code)
+
+    async def resume(gateway, websocket):
+        await hello(websocket)
+        await receive(websocket, discord.RESUME)
+        await send(websocket, discord.DISPATCH, MESSAGE, 2, "MESSAGE_CREATE")
+        await websocket.wait_closed()
+
+    async def main():
+        async with Gateway(never_ack, resume) as gateway:
+            consumer = consume(gateway)
+            await consumer.run()
+        assert close_codes == [4000]
+        assert consumer.processed == 1
+
+    run(main())
+
+
+def test_fatal_close_code_raises():
+    async def reject_token(gateway, websocket):
+        await hello(websocket)
+        await receive(websocket, discord.IDENTIFY)
+        await websocket.close(4004, "Authentication failed")
+
+    async def main():
+        async with Gateway(reject_token) as gateway:
+            consumer = consume(gateway)
+            with pytest.raises(GatewayError) as error:
+                await consumer.run()
+        assert error.value.close_code == 4004
+        assert gateway.connections == 1
+
+    run(main())
+
+
+def test_handshake_failure_is_retried():
+    async def main():
+        async with Gateway(deliver_message) as gateway:
+            gateway.reject = 2
+            consumer = consume(gateway)
+            await consumer.run()
+        assert consumer.reconnects == 2
+        assert consumer.processed == 1
+
+    run(main())
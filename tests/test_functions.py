@@ -0,0 +1,41 @@
+import pytest
+
+from virtuals_sdk.executor import ActionExecutor
+from virtuals_sdk.functions.discord import DiscordClient
+from virtuals_sdk.functions.telegram import TelegramClient
+from virtuals_sdk.game import Agent
+
+
+def test_same_function_of_two_clients_is_rejected():
+    first = TelegramClient("111:FIRST").get_function("send_message")
+    second = TelegramClient("222:SECOND").get_function("send_message")
+    assert first.id == second.id
+
+    agent = Agent("api-key")
+    agent.add_custom_function(first)
+    with pytest.raises(ValueError):
+        agent.add_custom_function(second)
+    assert agent.custom_functions == [first]
+    with pytest.raises(ValueError):
+        ActionExecutor([first, second])
+
+
+def test_same_name_on_two_platforms():
+    telegram = TelegramClient("111:TOKEN").get_function("send_message")
+    discord = DiscordClient("111:TOKEN").get_function("send_message")
+    assert telegram.id != discord.id
+
+    executor = ActionExecutor([telegram, discord])
+    assert executor.by_name["send_message"] is telegram
+    assert executor.by_id == {telegram.id: telegram, discord.id: discord}
+
+
+def test_clients_do_not_share_payloads():
+    first = TelegramClient("111:FIRST").get_function("send_message")
+    second = TelegramClient("222:SECOND").get_function("send_message")
+    assert first.config.payload == second.config.payload
+    assert first.config.payload is not second.config.payload
+    assert first.config.payloadString == second.config.payloadString
+
+    first.config.payload["parse_mode"] = "HTML"
+    assert "parse_mode" not in second.config.payload